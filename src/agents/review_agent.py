@@ -3,10 +3,10 @@ Clean modular review agent.
 Uses separated prompts, utilities, and core infrastructure.
 """
 
-import json
 from textwrap import dedent
 from typing import List, Any, Dict, Optional
 
+from src.core.llm.utils import dump_json
 from .utils.agent_factory import create_review_agent
 
 
@@ -44,7 +44,7 @@ async def run(
     content = await agent.run(dedent(f"""
         project_id={project_id}
         work_branch={work_branch}
-        plan_json={json.dumps(plan_json or {}, ensure_ascii=False)}
+        plan_json={dump_json(plan_json or {})}
         apply=true
     """), show_tokens=show_tokens)
     
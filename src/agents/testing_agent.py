@@ -3,10 +3,10 @@ Clean modular testing agent.
 Uses separated prompts, utilities, and core infrastructure.
 """
 
-import json
 from textwrap import dedent
 from typing import List, Any, Dict, Optional
 
+from src.core.llm.utils import dump_json
 from .utils.agent_factory import create_testing_agent
 
 
@@ -51,7 +51,7 @@ async def run(
     content = await agent.run(dedent(f"""
         project_id={project_id}
         work_branch={work_branch}
-        plan_json={json.dumps(plan_json or {}, ensure_ascii=False)}
+        plan_json={dump_json(plan_json or {})}
         apply=true{fix_context}
     """), show_tokens=show_tokens)
     
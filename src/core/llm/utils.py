@@ -7,6 +7,27 @@ import re
 import json
 from typing import Optional, Dict, Any
 
+try:
+    import orjson
+except ImportError:  # orjson is optional - fall back to the stdlib encoder
+    orjson = None
+
+
+def dump_json(data: Any) -> str:
+    """
+    Serialize data to a compact JSON string for agent prompts.
+    Uses orjson when installed, otherwise the stdlib encoder.
+
+    Args:
+        data: JSON-serializable object
+
+    Returns:
+        JSON string (non-ASCII characters are kept as-is)
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(data, ensure_ascii=False)
+
 
 def extract_json_block(text: str) -> Optional[Dict[Any, Any]]:
     """
@@ -4,6 +4,7 @@ Handles connection and tool loading from GitLab MCP server.
 Uses Streamable HTTP transport (stateless by design).
 """
 
+import asyncio
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from src.core.llm.config import Config
 from typing import Tuple, List, Any, Optional
@@ -11,11 +12,18 @@ from typing import Tuple, List, Any, Optional
 # Global cache for MCP connection
 _mcp_cache: Optional[Tuple[List[Any], MultiServerMCPClient]] = None
 
+# Serializes the first connection so concurrent callers share one handshake
+_mcp_lock = asyncio.Lock()
+
 async def load_mcp_tools(log_callback=None) -> Tuple[List[Any], MultiServerMCPClient]:
     """
     Initialize MCP client and load GitLab tools.
     Uses caching to avoid recreating connections.
 
+    Concurrent callers (e.g. the web GUI routes and the supervisor) wait on a
+    shared lock while the first connection is established, so the MCP
+    handshake and tool listing happen exactly once per process.
+
     Args:
         log_callback: Optional async function to send logs (for WebSocket integration)
 
@@ -39,6 +47,28 @@ async def load_mcp_tools(log_callback=None) -> Tuple[List[Any], MultiServerMCPCl
         await log(f"[MCP] Using cached connection ({len(tools)} tools)", "info")
         return tools, client
 
+    async with _mcp_lock:
+        # Another caller may have connected while we were waiting
+        if _mcp_cache is not None:
+            tools, client = _mcp_cache
+            await log(f"[MCP] Using cached connection ({len(tools)} tools)", "info")
+            return tools, client
+
+        tools, client = await _connect(log)
+        _mcp_cache = (tools, client)
+        return tools, client
+
+
+async def _connect(log) -> Tuple[List[Any], MultiServerMCPClient]:
+    """
+    Open the GitLab MCP client and fetch its tools.
+
+    Args:
+        log: Async logging helper from load_mcp_tools
+
+    Returns:
+        Tuple of (tools list, MCP client instance)
+    """
     url = Config.get_mcp_url()
     await log(f"[MCP] Connecting to {url}...", "info")
 
@@ -67,8 +97,6 @@ async def load_mcp_tools(log_callback=None) -> Tuple[List[Any], MultiServerMCPCl
 
     try:
         # Initialize multi-server MCP client with timeout
-        import asyncio
-
         async def init_client():
             with open(os.devnull, 'w') as devnull:
                 with redirect_stderr(devnull), redirect_stdout(devnull):  # Suppress all output during init
@@ -88,10 +116,7 @@ async def load_mcp_tools(log_callback=None) -> Tuple[List[Any], MultiServerMCPCl
             tools, client = await asyncio.wait_for(init_client(), timeout=10.0)
             await log(f"[MCP] Successfully connected! Loaded {len(tools)} tools", "success")
 
-            # Cache the connection for reuse
             # Note: Tools will be wrapped in get_common_tools_and_client()
-            _mcp_cache = (tools, client)
-
             return tools, client
 
         except asyncio.TimeoutError:
@@ -32,6 +32,10 @@ REM Start the FastAPI server
 REM Running without reload to prevent issues with file watching on Windows
 REM WebSocket timeout increased to 60s to match client ping interval (30s)
 REM This prevents server from closing "idle" connections during long agent runs
-python -m uvicorn web_gui.backend.app:app --host 0.0.0.0 --port 8000 --timeout-keep-alive 60 --ws-ping-interval 20 --ws-ping-timeout 60
+REM Single worker: orchestrator state and WebSocket sessions live in process memory
+REM (uvloop is not available on Windows; elsewhere uvicorn picks it up automatically)
+REM Dashboard clients only send small commands: no per-message-deflate contexts per connection
+REM (large broadcasts are compressed once by the app) and small inbound message limits
+python -m uvicorn web_gui.backend.app:app --host 0.0.0.0 --port 8000 --http httptools --timeout-keep-alive 60 --ws-ping-interval 20 --ws-ping-timeout 60 --ws-per-message-deflate false --ws-max-size 1048576 --ws-max-queue 8
 
 pause
\ No newline at end of file
@@ -0,0 +1,89 @@
+"""Tests for the TTL response cache"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from web_gui.backend.core import cache as cache_module
+from web_gui.backend.core.cache import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Manually advanced monotonic clock for the cache module"""
+    now = [1000.0]
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def _counting_factory():
+    calls = []
+
+    async def factory():
+        calls.append(1)
+        return len(calls)
+
+    return factory, calls
+
+
+def test_hit_then_expiry(clock):
+    cache = TTLCache(ttl=60)
+    factory, calls = _counting_factory()
+
+    async def scenario():
+        assert await cache.get_or_set("projects", factory) == 1
+        clock[0] += 59
+        assert await cache.get_or_set("projects", factory) == 1  # Hit
+        clock[0] += 1
+        assert await cache.get_or_set("projects", factory) == 2  # Expired
+
+    asyncio.run(scenario())
+    assert len(calls) == 2
+
+
+def test_concurrent_misses_run_factory_once(clock):
+    cache = TTLCache(ttl=60)
+    calls = []
+
+    async def slow_factory():
+        calls.append(1)
+        await asyncio.sleep(0)
+        return "value"
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get_or_set("key", slow_factory) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == ["value"] * 5
+    assert len(calls) == 1
+    assert cache._locks == {}
+
+
+def test_expired_entries_are_evicted_on_store(clock):
+    cache = TTLCache(ttl=60)
+    factory, _ = _counting_factory()
+
+    async def scenario():
+        for key in range(10):
+            await cache.get_or_set(key, factory)
+        clock[0] += 60
+        await cache.get_or_set("fresh", factory)
+
+    asyncio.run(scenario())
+    assert list(cache._entries) == ["fresh"]
+
+
+def test_failed_factory_is_not_cached_and_frees_its_lock(clock):
+    cache = TTLCache(ttl=60)
+
+    async def failing_factory():
+        raise RuntimeError("upstream down")
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await cache.get_or_set("key", failing_factory)
+        assert cache._locks == {}
+        factory, _ = _counting_factory()
+        return await cache.get_or_set("key", factory)
+
+    assert asyncio.run(scenario()) == 1
@@ -0,0 +1,55 @@
+"""Tests for the /api/llm/current snapshot"""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.core.llm.config import Config
+from web_gui.backend.api import routes
+from web_gui.backend.core.orchestrator import SystemOrchestrator
+from web_gui.backend.core.websocket import ConnectionManager
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.include_router(routes.router, prefix="/api")
+    return TestClient(app)
+
+
+def test_current_llm_config_follows_gui_selection(monkeypatch):
+    monkeypatch.setenv("LLM_PROVIDER", "deepseek")
+    monkeypatch.setenv("LLM_MODEL", "deepseek-chat")
+    monkeypatch.setenv("LLM_TEMPERATURE", "0.7")
+    for name in ("LLM_PROVIDER", "LLM_MODEL", "LLM_TEMPERATURE"):
+        monkeypatch.setattr(Config, name, getattr(Config, name, None))
+    monkeypatch.setattr(routes, "_llm_settings", None)
+    client = _client()
+
+    assert client.get("/api/llm/current").json() == {
+        "provider": "deepseek", "model": "deepseek-chat", "temperature": 0.7
+    }
+
+    orchestrator = SystemOrchestrator(ConnectionManager())
+    orchestrator._apply_llm_config({
+        "llm_config": {"provider": "openai", "model": "gpt-4o", "temperature": 0.2}
+    })
+
+    assert client.get("/api/llm/current").json() == {
+        "provider": "openai", "model": "gpt-4o", "temperature": 0.2
+    }
+
+
+def test_models_fallback_is_not_cached(monkeypatch):
+    from src.core.llm.llm_providers import ModelConfigs
+
+    routes._llm_models.cache.invalidate()
+    client = _client()
+
+    def unavailable(provider):
+        raise RuntimeError("registry unavailable")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(ModelConfigs, "get_models_for_provider", unavailable)
+        assert client.get("/api/llm/models/deepseek").json() == routes._models_fallback("deepseek")
+
+    models = client.get("/api/llm/models/deepseek").json()["models"]
+    assert models == ModelConfigs.get_models_for_provider("deepseek")
@@ -0,0 +1,43 @@
+"""Tests for the token-bucket rate limiter"""
+
+from types import SimpleNamespace
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from web_gui.backend.core import ratelimit
+from web_gui.backend.core.ratelimit import TokenBucket, rate_limited
+
+
+def test_rejects_with_retry_after_once_bucket_is_empty():
+    router = APIRouter()
+
+    @router.get("/limited")
+    @rate_limited(limit=2, period=60)
+    async def limited():
+        return {"ok": True}
+
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+
+    assert client.get("/limited").status_code == 200
+    assert client.get("/limited").status_code == 200
+
+    response = client.get("/limited")
+    assert response.status_code == 429
+    assert response.json() == {"detail": "Too many requests"}
+    assert 1 <= int(response.headers["Retry-After"]) <= 30
+
+
+def test_bucket_refills_over_time(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(ratelimit, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+    bucket = TokenBucket(limit=1, period=10)
+
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+    assert bucket.retry_after() == 10
+
+    clock[0] += 10
+    assert bucket.try_acquire()
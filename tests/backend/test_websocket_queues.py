@@ -0,0 +1,169 @@
+"""Tests for the WebSocket broadcast batching and per-client queues"""
+
+import asyncio
+import logging
+
+import orjson
+
+from web_gui.backend.core import websocket as websocket_module
+from web_gui.backend.core.websocket import ClientQueue, ConnectionManager
+
+
+class FakeWebSocket:
+    """Records sent frames; send_bytes hangs while `blocked` is set"""
+
+    def __init__(self):
+        self.client = None
+        self.sent = []
+        self.close_code = None
+        self.blocked = False
+
+    async def accept(self):
+        pass
+
+    async def send_bytes(self, payload: bytes):
+        if self.blocked:
+            await asyncio.Event().wait()
+        self.sent.append(payload)
+
+    async def send_text(self, text: str):
+        self.sent.append(text)
+
+    async def close(self, code: int = 1000):
+        self.close_code = code
+
+
+def _manager() -> ConnectionManager:
+    manager = ConnectionManager()
+    manager.debug_mode = False
+    return manager
+
+
+def _broadcast_frames(*events):
+    """Frames a connected client receives for events sent within one window"""
+    manager = _manager()
+    websocket = FakeWebSocket()
+
+    async def scenario():
+        await manager.connect(websocket)
+        await asyncio.sleep(0)
+        websocket.sent.clear()  # Drop the session state sent on connect
+
+        for event_type, data in events:
+            await manager.send_event(event_type, data)
+        await asyncio.sleep(manager.broadcaster.window * 10)
+
+        await manager.disconnect_all()
+        await manager.stop_broadcaster()
+
+    asyncio.run(scenario())
+    return [orjson.loads(frame) for frame in websocket.sent]
+
+
+def test_events_within_window_are_sent_as_one_batch():
+    frames = _broadcast_frames(
+        ("pipeline_update", {"stage": "coding", "status": "running"}),
+        ("mcp_log", {"message": "list_issues", "level": "info"}),
+    )
+
+    assert len(frames) == 1
+    assert frames[0]["type"] == "batch"
+    assert [event["type"] for event in frames[0]["events"]] == ["pipeline_update", "mcp_log"]
+
+
+def test_lone_event_is_sent_unwrapped():
+    frames = _broadcast_frames(("pipeline_update", {"stage": "testing", "status": "running"}))
+
+    assert [frame["type"] for frame in frames] == ["pipeline_update"]
+
+
+def test_event_is_encoded_once_for_history_and_broadcast(monkeypatch):
+    encoded_types = []
+    encode_message = websocket_module.encode_message
+
+    def counting_encode(message):
+        encoded_types.append(message["type"])
+        return encode_message(message)
+
+    monkeypatch.setattr(websocket_module, "encode_message", counting_encode)
+    frames = _broadcast_frames(("pipeline_update", {"stage": "testing", "status": "running"}))
+
+    assert [frame["type"] for frame in frames] == ["pipeline_update"]
+    assert encoded_types.count("pipeline_update") == 1
+
+
+def test_consecutive_agent_output_is_folded():
+    frames = _broadcast_frames(
+        *[("agent_output", {"agent": "Coding Agent", "content": c, "level": "info"}) for c in "abc"],
+        ("pipeline_update", {"stage": "coding", "status": "running"}),
+    )
+
+    assert len(frames) == 1
+    events = frames[0]["events"]
+    assert [event["type"] for event in events] == ["agent_output_batch", "pipeline_update"]
+    assert events[0]["data"] == {"agent": "Coding Agent", "level": "info", "contents": ["a", "b", "c"]}
+
+
+def test_client_queue_drops_oldest_frame_when_full():
+    client = ClientQueue(_manager(), FakeWebSocket(), maxsize=2)
+
+    for payload in (b"1", b"2", b"3"):
+        client.put(payload)
+
+    assert [client.queue.get_nowait() for _ in range(2)] == [b"2", b"3"]
+    assert client.dropped == 1
+
+
+def test_client_queue_evicts_client_that_stays_full():
+    manager = _manager()
+    websocket = FakeWebSocket()
+
+    async def scenario():
+        await manager.connect(websocket)
+        websocket.blocked = True
+        client = manager.client_queues[websocket]
+
+        client.put(b"first")
+        await asyncio.sleep(0)  # The writer takes it and hangs in send_bytes
+        for i in range(2 * client.queue.maxsize):
+            client.put(b"%d" % i)
+        await asyncio.sleep(0)  # Let the close task run
+        return client
+
+    client = asyncio.run(scenario())
+
+    assert websocket not in manager.connections
+    assert websocket not in manager.client_queues
+    assert websocket.close_code == 1013
+    assert manager.disconnection_log[-1]["reason"] == f"Client too slow ({client.dropped} frames dropped)"
+
+
+def test_debug_mode_lets_connection_diagnostics_through():
+    backend_logger = logging.getLogger("web_gui")
+    ws_logger = logging.getLogger("web_gui.backend.core.websocket")
+    manager = _manager()
+
+    manager.debug_mode = True
+    assert ws_logger.isEnabledFor(logging.DEBUG)
+
+    manager.debug_mode = False
+    assert ws_logger.getEffectiveLevel() == backend_logger.getEffectiveLevel()
+
+
+def test_personal_messages_queue_behind_the_writer():
+    manager = _manager()
+    websocket = FakeWebSocket()
+
+    async def scenario():
+        await manager.connect(websocket)
+        await asyncio.sleep(0)
+        websocket.blocked = True
+        client = manager.client_queues[websocket]
+
+        await manager.broadcast_bytes(b"broadcast")
+        await asyncio.sleep(0)  # The writer hangs sending the broadcast
+        await manager.send_personal_message(b"reply", websocket)
+
+        return client.queue.get_nowait()
+
+    assert asyncio.run(scenario()) == b"reply"
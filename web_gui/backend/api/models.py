@@ -2,10 +2,18 @@
 Pydantic models for API requests and responses
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+from pydantic.dataclasses import dataclass
 from typing import Optional, Dict, Any, List
 from enum import Enum
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import partial
+
+# Bound once so default_factory skips the attribute lookup on each message
+_utcnow = partial(datetime.now, timezone.utc)
+
+# Event models are built, serialized and discarded: immutable, no extras dict
+_EVENT_CONFIG = ConfigDict(frozen=True, extra="forbid")
 
 
 class ExecutionMode(str, Enum):
@@ -17,8 +25,11 @@ class ExecutionMode(str, Enum):
 
 class SystemConfig(BaseModel):
     """System configuration request"""
+    # Store mode as its plain string so serialization skips the enum lookup
+    model_config = ConfigDict(use_enum_values=True)
+
     project_id: str = Field(..., description="GitLab project ID")
-    mode: ExecutionMode = Field(default=ExecutionMode.IMPLEMENT_ALL)
+    mode: ExecutionMode = Field(default=ExecutionMode.IMPLEMENT_ALL, validate_default=True)
     specific_issue: Optional[int] = Field(default=None, description="Specific issue number for single issue mode")
     # tech_stack removed - now auto-detected from project files
     auto_merge: bool = Field(default=False, description="Automatically merge successful MRs")
@@ -39,6 +50,8 @@ class SystemStatus(BaseModel):
 
 class AgentOutput(BaseModel):
     """Agent output event"""
+    model_config = _EVENT_CONFIG
+
     agent: str
     timestamp: datetime
     content: str
@@ -47,6 +60,8 @@ class AgentOutput(BaseModel):
 
 class ToolUse(BaseModel):
     """Tool usage event"""
+    model_config = _EVENT_CONFIG
+
     agent: str
     tool: str
     timestamp: datetime
@@ -56,8 +71,9 @@ class ToolUse(BaseModel):
     success: bool
 
 
-class PipelineStage(BaseModel):
-    """Pipeline stage information"""
+@dataclass(slots=True, frozen=True, config=ConfigDict(extra="forbid"))
+class PipelineStage:
+    """Pipeline stage information (slotted: one per stage per issue)"""
     name: str
     status: str  # pending, running, completed, failed
     start_time: Optional[datetime]
@@ -67,6 +83,8 @@ class PipelineStage(BaseModel):
 
 class IssueStatus(BaseModel):
     """Issue processing status"""
+    model_config = _EVENT_CONFIG
+
     issue_id: int
     title: str
     status: str  # pending, processing, completed, failed
@@ -96,6 +114,9 @@ class APIResponse(BaseModel):
 
 class WebSocketMessage(BaseModel):
     """WebSocket message structure"""
+    # Emit timestamps as epoch seconds instead of ISO-8601 strings
+    model_config = ConfigDict(**_EVENT_CONFIG, ser_json_temporal="seconds")
+
     type: str
     data: Any
-    timestamp: datetime = Field(default_factory=datetime.now)
\ No newline at end of file
+    timestamp: datetime = Field(default_factory=_utcnow)
@@ -2,48 +2,166 @@
 API routes for the AgenticSys Web GUI
 """
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
 from typing import List, Optional
+from itertools import islice
+import asyncio
+import hashlib
+import io
+import logging
 import os
-import json
-import traceback
+import re
+import orjson
+from dataclasses import dataclass, asdict, replace
 from datetime import datetime
 
+try:
+    import ijson
+except ImportError:  # optional - large MCP results are then parsed in one go
+    ijson = None
+
 from .models import (
     SystemConfig, SystemStatus, APIResponse,
     ProjectInfo, IssueStatus
 )
+from ..core.mcp_cache import get_mcp, get_mcp_tool
+from ..core.orchestrator import SystemOrchestrator, get_orchestrator
+from ..core.cache import cached
+from ..core.ratelimit import rate_limited
 
 router = APIRouter()
-
-# Store for system state (will be replaced with proper state management)
-system_state = {
-    "config": None,
-    "status": None,
-    "orchestrator": None
-}
+logger = logging.getLogger(__name__)
+
+# MCP results at least this large are stream-parsed (when ijson is installed)
+STREAM_PARSE_THRESHOLD = 64 * 1024
+
+def _parse_records(result: str, limit: int, container_key: Optional[str] = None) -> list:
+    """
+    Parse at most `limit` records from a JSON MCP tool result.
+
+    Small payloads are parsed with orjson. Large ones are stream-parsed with
+    ijson so records past the limit are never materialized.
+
+    Args:
+        result: JSON text returned by the MCP tool
+        limit: Maximum number of records to return
+        container_key: Key holding the record list when the payload is an object
+
+    Returns:
+        List of at most `limit` records
+    """
+    if ijson is None or len(result) < STREAM_PARSE_THRESHOLD:
+        parsed = orjson.loads(result)
+        if isinstance(parsed, dict) and container_key:
+            parsed = parsed.get(container_key, [])
+        return parsed[:limit] if isinstance(parsed, list) else []
+
+    data = result.encode('utf-8') if isinstance(result, str) else result
+    head = data.lstrip()[:1]
+    if head == b'[':
+        prefix = 'item'
+    elif head == b'{' and container_key:
+        prefix = f'{container_key}.item'
+    else:
+        return []
+
+    records = ijson.items(io.BytesIO(data), prefix, use_float=True)
+    return list(islice(records, limit))
+
+
+def _as_records(result, limit: int, container_key: Optional[str] = None) -> list:
+    """
+    Normalize an MCP tool result to a list of at most `limit` records.
+
+    Already-parsed lists/dicts are used directly; only JSON text is parsed.
+    Anything unparseable yields an empty list.
+    """
+    if isinstance(result, list):
+        return result[:limit]
+    if isinstance(result, dict):
+        records = result.get(container_key, []) if container_key else []
+        return records[:limit] if isinstance(records, list) else []
+    if isinstance(result, (str, bytes)):
+        try:
+            return _parse_records(result, limit, container_key)
+        except Exception:
+            return []
+    return []
+
+
+def _as_text(result) -> str:
+    """Get file content from an MCP tool result without falling back to repr()"""
+    if isinstance(result, str):
+        return result
+    if isinstance(result, bytes):
+        return result.decode('utf-8', errors='replace')
+    if isinstance(result, (dict, list)):
+        return orjson.dumps(result).decode()
+    return str(result)
+
+
+def _project_info(proj: dict) -> ProjectInfo:
+    """
+    Build a ProjectInfo from a GitLab project record.
+
+    Defaults are filled in here, so the model is constructed without
+    re-running validation (the response model still checks the output).
+    """
+    get = proj.get
+    open_issues = get('open_issues_count') or 0
+    return ProjectInfo.model_construct(
+        id=str(get('id', '')),
+        name=get('name_with_namespace') or get('name') or '',
+        description=get('description') or '',
+        default_branch=get('default_branch') or 'main',
+        web_url=get('web_url') or '',
+        issues_count=open_issues,
+        open_issues=open_issues
+    )
+
+
+def _issue_summary(issue: dict) -> dict:
+    """Reduce a GitLab issue record to the fields the frontend uses"""
+    get = issue.get
+    assignee = get('assignee')
+    return {
+        'id': get('id', ''),
+        'iid': get('iid', ''),
+        'title': get('title', ''),
+        'description': get('description', ''),
+        'state': get('state', 'opened'),
+        'labels': get('labels', []),
+        'assignee': assignee.get('name', '') if assignee else '',
+        'web_url': get('web_url', ''),
+        'created_at': get('created_at', ''),
+        'updated_at': get('updated_at', '')
+    }
 
 
 @router.post("/system/start", response_model=APIResponse)
-async def start_system(config: SystemConfig):
+async def start_system(
+    config: SystemConfig,
+    orchestrator: SystemOrchestrator = Depends(get_orchestrator)
+):
     """Start the autonomous system with given configuration"""
     try:
-        # Import here to avoid circular imports
-        from ..core.orchestrator import get_orchestrator
-
-        orchestrator = get_orchestrator()
-
         # Validate project ID
         if not config.project_id:
             raise HTTPException(status_code=400, detail="Project ID is required")
 
+        # Project data may change during the run, so drop the cached list
+        _mcp_projects.cache.invalidate()
+
+        # Serialize once; the same dict goes to the orchestrator and the response
+        payload = config.model_dump(mode='json')
+
         # Start the system
-        await orchestrator.start(config.dict())
+        await orchestrator.start(payload)
 
         return APIResponse(
             success=True,
             message="System started successfully",
-            data={"config": config.dict()}
+            data={"config": payload}
         )
 
     except Exception as e:
@@ -51,12 +169,9 @@ async def start_system(config: SystemConfig):
 
 
 @router.post("/system/stop", response_model=APIResponse)
-async def stop_system():
+async def stop_system(orchestrator: SystemOrchestrator = Depends(get_orchestrator)):
     """Stop the running system"""
     try:
-        from ..core.orchestrator import get_orchestrator
-
-        orchestrator = get_orchestrator()
         await orchestrator.stop()
 
         return APIResponse(
@@ -70,96 +185,68 @@ async def stop_system():
 
 
 @router.get("/system/status", response_model=SystemStatus)
-async def get_system_status():
+async def get_system_status(orchestrator: SystemOrchestrator = Depends(get_orchestrator)):
     """Get current system status"""
-    from web_gui.backend.core.orchestrator import get_orchestrator
-
-    orchestrator = get_orchestrator()
     status = orchestrator.get_status()
 
     return SystemStatus(**status)
 
 
+@cached(ttl=300)
+@rate_limited(limit=30, period=60)
+async def _mcp_projects() -> List[ProjectInfo]:
+    """
+    Load GitLab projects via MCP.
+
+    Failures raise instead of returning a fallback, so only real MCP
+    results are cached.
+    """
+    # Cached MCP tools, indexed by name
+    tools, client = await get_mcp()
+    list_projects_tool = tools.get('list_projects')
+    if not list_projects_tool:
+        raise LookupError("gitlab_list_projects tool not found")
+
+    # Invoke the tool to get projects
+    logger.info("Calling list_projects tool")
+    result = await list_projects_tool.ainvoke({
+        'include_archived': False,
+        'order_by': 'last_activity_at',
+        'sort': 'desc'
+    })
+
+    logger.debug("Tool result type: %s", type(result))
+
+    if not result:
+        return []
+
+    # JSON text or already parsed, limited to 20 projects
+    project_list = _as_records(result, 20, 'projects')
+
+    # Convert to ProjectInfo objects
+    projects = [_project_info(proj) for proj in project_list if isinstance(proj, dict)]
+
+    logger.info("Loaded %d projects from GitLab", len(projects))
+    return projects
+
+
 @router.get("/projects", response_model=List[ProjectInfo])
 async def get_projects():
     """Get list of available GitLab projects"""
     try:
-        projects = []
-
-        # Try to get projects via MCP client
         try:
-            from src.infrastructure.mcp_client import load_mcp_tools
-
-            # Load MCP tools
-            tools, client = await load_mcp_tools()
-
-            # Find the list_projects tool
-            list_projects_tool = None
-            for tool in tools:
-                if hasattr(tool, 'name'):
-                    print(f"[DEBUG] Found tool: {tool.name}")
-                    if tool.name == 'list_projects':
-                        list_projects_tool = tool
-                        break
-
-            if list_projects_tool:
-                # Invoke the tool to get projects
-                print("[INFO] Calling list_projects tool")
-                result = await list_projects_tool.ainvoke({
-                    'include_archived': False,
-                    'order_by': 'last_activity_at',
-                    'sort': 'desc'
-                })
-
-                print(f"[DEBUG] Tool result type: {type(result)}")
-
-                # Parse the result
-                if result:
-                    # The result might be a string (JSON) or already parsed
-                    import json
-                    if isinstance(result, str):
-                        try:
-                            parsed_result = json.loads(result)
-                        except:
-                            parsed_result = result
-                    else:
-                        parsed_result = result
-
-                    # Extract projects from the result
-                    if isinstance(parsed_result, list):
-                        project_list = parsed_result
-                    elif isinstance(parsed_result, dict) and 'projects' in parsed_result:
-                        project_list = parsed_result['projects']
-                    else:
-                        project_list = []
-
-                    # Convert to ProjectInfo objects
-                    for proj in project_list[:20]:  # Limit to 20 projects
-                        if isinstance(proj, dict):
-                            projects.append(ProjectInfo(
-                                id=str(proj.get('id', '')),
-                                name=proj.get('name_with_namespace', proj.get('name', '')),
-                                description=proj.get('description', '') or '',
-                                default_branch=proj.get('default_branch', 'main'),
-                                web_url=proj.get('web_url', ''),
-                                issues_count=proj.get('open_issues_count', 0),
-                                open_issues=proj.get('open_issues_count', 0)
-                            ))
-
-                    print(f"[INFO] Loaded {len(projects)} projects from GitLab")
-            else:
-                print("[WARN] gitlab_list_projects tool not found")
-
+            projects = await _mcp_projects()
+        except HTTPException:
+            raise
         except Exception as e:
-            print(f"[ERROR] Failed to load projects via MCP: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.error("Failed to load projects via MCP: %s", e, exc_info=True)
+            projects = []
 
         # Fallback: Check if there's a project configured in environment
         if not projects:
             gitlab_project = os.getenv("GITLAB_PROJECT_ID")
             if gitlab_project:
-                projects.append(ProjectInfo(
+                return [ProjectInfo(
                     id=gitlab_project,
                     name=f"Project {gitlab_project}",
                     description="Environment configured project",
@@ -167,15 +254,18 @@ async def get_projects():
                     web_url=f"{os.getenv('GITLAB_URL', 'https://gitlab.com')}/projects/{gitlab_project}",
                     issues_count=0,
                     open_issues=0
-                ))
+                )]
 
         return projects
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/projects/{project_id}/issues")
+@rate_limited(limit=30, period=60)
 async def get_project_issues(project_id: str, state: str = "opened"):
     """Get issues for a specific project"""
     try:
@@ -183,48 +273,23 @@ async def get_project_issues(project_id: str, state: str = "opened"):
 
         # Try to get issues via MCP client
         try:
-            from src.infrastructure.mcp_client import load_mcp_tools
-            tools, client = await load_mcp_tools()
-
-            # Look for the list_issues tool
-            for tool in tools:
-                if hasattr(tool, 'name'):
-                    # Use the list_issues tool
-                    if tool.name == 'list_issues':
-                        result = await tool.ainvoke({
-                            'project_id': project_id,
-                            'state': state
-                        })
-
-                        # Parse result (might be JSON string)
-                        if result:
-                            if isinstance(result, str):
-                                try:
-                                    result = json.loads(result)
-                                except:
-                                    pass
-
-                            if isinstance(result, list):
-                                issue_list = result
-                            else:
-                                issue_list = []
-
-                            for issue in issue_list[:20]:  # Limit to 20 issues
-                                issues.append({
-                                    'id': issue.get('id', ''),
-                                    'iid': issue.get('iid', ''),
-                                    'title': issue.get('title', ''),
-                                    'description': issue.get('description', ''),
-                                    'state': issue.get('state', 'opened'),
-                                    'labels': issue.get('labels', []),
-                                    'assignee': issue.get('assignee', {}).get('name', '') if issue.get('assignee') else '',
-                                    'web_url': issue.get('web_url', ''),
-                                    'created_at': issue.get('created_at', ''),
-                                    'updated_at': issue.get('updated_at', '')
-                                })
-                            break
+            tools, client = await get_mcp()
+
+            # Use the list_issues tool
+            tool = tools.get('list_issues')
+            if tool:
+                result = await tool.ainvoke({
+                    'project_id': project_id,
+                    'state': state
+                })
+
+                # Parse result (JSON text or already parsed), limited to 20 issues
+                if result:
+                    issue_list = _as_records(result, 20)
+
+                    issues = [_issue_summary(issue) for issue in issue_list]
         except Exception as e:
-            print(f"[INFO] MCP client not available for issues: {e}")
+            logger.info("MCP client not available for issues: %s", e)
             # Return mock data if MCP is not available
             issues = [
                 {
@@ -259,7 +324,75 @@ async def get_project_issues(project_id: str, state: str = "opened"):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Marker file -> (language, {field: [(value, keyword alternation), ...]}).
+# Earlier entries win within a field, matching the original if/elif order.
+_PYTHON_RULES = ('Python', {
+    'framework': [('FastAPI', 'fastapi'), ('Django', 'django'), ('Flask', 'flask')],
+    'database': [('PostgreSQL', 'postgresql|psycopg'), ('MySQL', 'mysql|pymysql'),
+                 ('MongoDB', 'mongodb|pymongo')],
+    'testing': [('pytest', 'pytest'), ('unittest', 'unittest')],
+})
+_JAVA_RULES = ('Java', {
+    'framework': [('Spring Boot', 'spring')],
+    'testing': [('JUnit', 'junit')],
+})
+_STACK_RULES = {
+    'package.json': ('JavaScript', {
+        'framework': [('React', 'react'), ('Vue.js', 'vue'), ('Angular', 'angular'),
+                      ('Express.js', 'express')],
+        'testing': [('Jest', 'jest'), ('Mocha', 'mocha')],
+    }),
+    'requirements.txt': _PYTHON_RULES,
+    'pyproject.toml': _PYTHON_RULES,
+    'pom.xml': _JAVA_RULES,
+    'build.gradle': _JAVA_RULES,
+    'Gemfile': ('Ruby', {
+        'framework': [('Ruby on Rails', 'rails')],
+        'testing': [('RSpec', 'rspec')],
+    }),
+    'go.mod': ('Go', {
+        'framework': [('Gin', 'gin'), ('Echo', 'echo')],
+    }),
+}
+
+
+def _compile_stack_scanner(language: Optional[str], rules: dict) -> tuple:
+    """Compile all keywords of one marker file into a single case-insensitive pattern"""
+    alternatives = ['(?P<docker>docker)']
+    fields = {}
+    for field, options in rules.items():
+        fields[field] = []
+        for value, keywords in options:
+            group = f"k{len(alternatives)}"
+            alternatives.append(f"(?P<{group}>{keywords})")
+            fields[field].append((group, value))
+    return language, re.compile('|'.join(alternatives), re.IGNORECASE), fields
+
+
+_STACK_SCANNERS = {file: _compile_stack_scanner(*rule) for file, rule in _STACK_RULES.items()}
+_DEFAULT_SCANNER = _compile_stack_scanner(None, {})
+
+
+def _apply_stack_rules(tech_stack: dict, file: str, content: str):
+    """Update tech_stack from one marker file using a single regex pass over its content"""
+    language, pattern, fields = _STACK_SCANNERS.get(file, _DEFAULT_SCANNER)
+    if language:
+        tech_stack['language'] = language
+
+    hits = {match.lastgroup for match in pattern.finditer(content)}
+    for field, options in fields.items():
+        for group, value in options:
+            if group in hits:
+                tech_stack[field] = value
+                break
+
+    # Check for Docker
+    if 'docker' in hits:
+        tech_stack['deployment'] = 'Docker'
+
+
 @router.post("/projects/{project_id}/detect-tech")
+@rate_limited(limit=5, period=60)
 async def detect_tech_stack(project_id: str):
     """Auto-detect technology stack for a project"""
     try:
@@ -274,103 +407,44 @@ async def detect_tech_stack(project_id: str):
 
         # Try to detect tech stack via MCP client
         try:
-            from src.infrastructure.mcp_client import get_common_tools_and_client
-            tools, client = await get_common_tools_and_client()
-
-            # Look for a tool that can get project files
-            for tool in tools:
-                if hasattr(tool, 'name'):
-                    # Try to get repository tree or files
-                    if 'get_file' in tool.name.lower() or 'repository_tree' in tool.name.lower():
-                        # Try to get common config files to detect tech stack
-                        files_to_check = [
-                            'package.json',
-                            'requirements.txt',
-                            'pyproject.toml',
-                            'pom.xml',
-                            'build.gradle',
-                            'Gemfile',
-                            'composer.json',
-                            'go.mod',
-                            'Cargo.toml'
-                        ]
-
-                        for file in files_to_check:
-                            try:
-                                result = await tool.invoke({
-                                    'project_id': project_id,
-                                    'file_path': file,
-                                    'ref': 'main'
-                                })
-
-                                if result:
-                                    # Analyze file content to detect tech stack
-                                    content = str(result)
-
-                                    if file == 'package.json':
-                                        tech_stack['language'] = 'JavaScript'
-                                        if 'react' in content.lower():
-                                            tech_stack['framework'] = 'React'
-                                        elif 'vue' in content.lower():
-                                            tech_stack['framework'] = 'Vue.js'
-                                        elif 'angular' in content.lower():
-                                            tech_stack['framework'] = 'Angular'
-                                        elif 'express' in content.lower():
-                                            tech_stack['framework'] = 'Express.js'
-                                        if 'jest' in content.lower():
-                                            tech_stack['testing'] = 'Jest'
-                                        elif 'mocha' in content.lower():
-                                            tech_stack['testing'] = 'Mocha'
-
-                                    elif file in ['requirements.txt', 'pyproject.toml']:
-                                        tech_stack['language'] = 'Python'
-                                        if 'fastapi' in content.lower():
-                                            tech_stack['framework'] = 'FastAPI'
-                                        elif 'django' in content.lower():
-                                            tech_stack['framework'] = 'Django'
-                                        elif 'flask' in content.lower():
-                                            tech_stack['framework'] = 'Flask'
-                                        if 'postgresql' in content.lower() or 'psycopg' in content.lower():
-                                            tech_stack['database'] = 'PostgreSQL'
-                                        elif 'mysql' in content.lower() or 'pymysql' in content.lower():
-                                            tech_stack['database'] = 'MySQL'
-                                        elif 'mongodb' in content.lower() or 'pymongo' in content.lower():
-                                            tech_stack['database'] = 'MongoDB'
-                                        if 'pytest' in content.lower():
-                                            tech_stack['testing'] = 'pytest'
-                                        elif 'unittest' in content.lower():
-                                            tech_stack['testing'] = 'unittest'
-
-                                    elif file == 'pom.xml' or file == 'build.gradle':
-                                        tech_stack['language'] = 'Java'
-                                        if 'spring' in content.lower():
-                                            tech_stack['framework'] = 'Spring Boot'
-                                        if 'junit' in content.lower():
-                                            tech_stack['testing'] = 'JUnit'
-
-                                    elif file == 'Gemfile':
-                                        tech_stack['language'] = 'Ruby'
-                                        if 'rails' in content.lower():
-                                            tech_stack['framework'] = 'Ruby on Rails'
-                                        if 'rspec' in content.lower():
-                                            tech_stack['testing'] = 'RSpec'
-
-                                    elif file == 'go.mod':
-                                        tech_stack['language'] = 'Go'
-                                        if 'gin' in content.lower():
-                                            tech_stack['framework'] = 'Gin'
-                                        elif 'echo' in content.lower():
-                                            tech_stack['framework'] = 'Echo'
-
-                                    # Check for Docker
-                                    if 'docker' in content.lower():
-                                        tech_stack['deployment'] = 'Docker'
-
-                            except:
-                                continue
-                        break
+            # Tool that can get repository files (classified once at load time)
+            file_tool = await get_mcp_tool('file_reader')
+
+            if file_tool:
+                # Try to get common config files to detect tech stack
+                files_to_check = [
+                    'package.json',
+                    'requirements.txt',
+                    'pyproject.toml',
+                    'pom.xml',
+                    'build.gradle',
+                    'Gemfile',
+                    'composer.json',
+                    'go.mod',
+                    'Cargo.toml'
+                ]
+
+                # The fetches are independent, so issue them concurrently
+                results = await asyncio.gather(*[
+                    file_tool.ainvoke({
+                        'project_id': project_id,
+                        'file_path': file,
+                        'ref': 'main'
+                    })
+                    for file in files_to_check
+                ], return_exceptions=True)
+
+                for file, result in zip(files_to_check, results):
+                    # Missing files come back as exceptions
+                    if not result or isinstance(result, BaseException):
+                        continue
+
+                    # Analyze file content to detect tech stack
+                    content = _as_text(result)
+                    _apply_stack_rules(tech_stack, file, content)
+
         except Exception as e:
-            print(f"[INFO] Could not auto-detect tech stack: {e}")
+            logger.info("Could not auto-detect tech stack: %s", e)
 
         return tech_stack  # Return plain dict (TechStack model removed)
 
@@ -378,144 +452,204 @@ async def detect_tech_stack(project_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _prepare_static_json(data: dict) -> tuple:
+    """Serialize a fixed payload once, returning (body, headers with ETag)"""
+    body = orjson.dumps(data)
+    headers = {
+        "ETag": f'"{hashlib.md5(body).hexdigest()}"',
+        "Cache-Control": "public, max-age=3600"
+    }
+    return body, headers
+
+
+def _static_json(request: Request, payload: tuple) -> Response:
+    """Serve a pre-serialized payload, answering matching If-None-Match with 304"""
+    body, headers = payload
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+AGENTS_JSON = _prepare_static_json({
+    "agents": [
+        {
+            "name": "Planning Agent",
+            "description": "Creates implementation plans from issues",
+            "status": "idle"
+        },
+        {
+            "name": "Coding Agent",
+            "description": "Implements the planned solution",
+            "status": "idle"
+        },
+        {
+            "name": "Testing Agent",
+            "description": "Creates and runs tests",
+            "status": "idle"
+        },
+        {
+            "name": "Review Agent",
+            "description": "Reviews code and creates merge requests",
+            "status": "idle"
+        }
+    ]
+})
+
+DEFAULTS_JSON = _prepare_static_json({
+    "mode": "implement_all",
+    "auto_merge": False,
+    "debug": False,
+    "min_coverage": 70.0,
+    "tech_stack": {
+        "language": "Python",
+        "testing": "pytest",
+        "ci_cd": "GitLab CI"
+    }
+})
+
+
 @router.get("/agents")
-async def get_agents_info():
+async def get_agents_info(request: Request):
     """Get information about available agents"""
-    return {
-        "agents": [
-            {
-                "name": "Planning Agent",
-                "description": "Creates implementation plans from issues",
-                "status": "idle"
-            },
-            {
-                "name": "Coding Agent",
-                "description": "Implements the planned solution",
-                "status": "idle"
-            },
-            {
-                "name": "Testing Agent",
-                "description": "Creates and runs tests",
-                "status": "idle"
-            },
-            {
-                "name": "Review Agent",
-                "description": "Reviews code and creates merge requests",
-                "status": "idle"
-            }
-        ]
-    }
+    return _static_json(request, AGENTS_JSON)
 
 
 @router.get("/config/defaults")
-async def get_default_config():
+async def get_default_config(request: Request):
     """Get default configuration values"""
-    return {
-        "mode": "implement_all",
-        "auto_merge": False,
-        "debug": False,
-        "min_coverage": 70.0,
-        "tech_stack": {
-            "language": "Python",
-            "testing": "pytest",
-            "ci_cd": "GitLab CI"
-        }
-    }
+    return _static_json(request, DEFAULTS_JSON)
 
 
 @router.get("/stats")
-async def get_statistics():
+async def get_statistics(orchestrator: SystemOrchestrator = Depends(get_orchestrator)):
     """Get system statistics"""
-    from web_gui.backend.core.orchestrator import get_orchestrator
-
-    orchestrator = get_orchestrator()
     return orchestrator.get_statistics()
 
 
 # LLM Configuration Endpoints
+def _providers_fallback() -> dict:
+    """Provider listing used when the provider registry cannot be loaded"""
+    return {
+        "providers": ["deepseek", "openai", "ollama"],
+        "default": "deepseek"
+    }
+
+
+def _models_fallback(provider: str) -> dict:
+    """Model listing used when the model registry cannot be loaded"""
+    fallback_models = {
+        "deepseek": {"deepseek-chat": "DeepSeek Chat", "deepseek-coder": "DeepSeek Coder"},
+        "openai": {"gpt-4": "GPT-4", "gpt-3.5-turbo": "GPT-3.5 Turbo"},
+        "ollama": {"llama2": "Llama 2", "codellama": "Code Llama"}
+    }
+    models = fallback_models.get(provider, {})
+    logger.debug("Using fallback models for %s: %s", provider, models)
+    return {
+        "models": models,
+        "default": next(iter(models), None)
+    }
+
+
+@cached(ttl=600)
+async def _llm_providers() -> dict:
+    """Provider listing from the registry; raises so failures are not cached"""
+    from src.core.llm.llm_providers import Providers
+
+    providers = Providers.get_all()
+    default_provider = Providers.get_default()
+
+    logger.debug("LLM providers loaded: %s, default: %s", providers, default_provider)
+    return {
+        "providers": providers,
+        "default": default_provider
+    }
+
+
+@cached(ttl=600)
+async def _llm_models(provider: str) -> dict:
+    """Model listing for a provider from the registry; raises so failures are not cached"""
+    from src.core.llm.llm_providers import ModelConfigs, LLMProviderConfig
+
+    models = ModelConfigs.get_models_for_provider(provider)
+    default_model = LLMProviderConfig.get_default_model_for_provider(provider)
+
+    logger.debug("LLM models for %s: %s, default: %s", provider, models, default_model)
+    return {
+        "models": models,
+        "default": default_model
+    }
+
+
 @router.get("/llm/providers")
 async def get_llm_providers():
     """Get available LLM providers"""
     try:
-        from src.core.llm.llm_providers import Providers
-
-        providers = Providers.get_all()
-        default_provider = Providers.get_default()
-
-        print(f"[DEBUG] LLM providers loaded: {providers}, default: {default_provider}")
-        return {
-            "providers": providers,
-            "default": default_provider
-        }
+        return await _llm_providers()
     except Exception as e:
-        print(f"[ERROR] Failed to get LLM providers: {e}")
-        import traceback
-        traceback.print_exc()
-        return {
-            "providers": ["deepseek", "openai", "ollama"],
-            "default": "deepseek"
-        }
+        logger.error("Failed to get LLM providers: %s", e, exc_info=True)
+        return _providers_fallback()
 
 
 @router.get("/llm/models/{provider}")
 async def get_llm_models(provider: str):
     """Get available models for a specific provider"""
     try:
-        from src.core.llm.llm_providers import ModelConfigs, LLMProviderConfig
-
-        models = ModelConfigs.get_models_for_provider(provider)
-        default_model = LLMProviderConfig.get_default_model_for_provider(provider)
-
-        print(f"[DEBUG] LLM models for {provider}: {models}, default: {default_model}")
-        return {
-            "models": models,
-            "default": default_model
-        }
+        return await _llm_models(provider)
     except Exception as e:
-        print(f"[ERROR] Failed to get models for provider {provider}: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.error("Failed to get models for provider %s: %s", provider, e, exc_info=True)
         # Return fallback data
-        fallback_models = {
-            "deepseek": {"deepseek-chat": "DeepSeek Chat", "deepseek-coder": "DeepSeek Coder"},
-            "openai": {"gpt-4": "GPT-4", "gpt-3.5-turbo": "GPT-3.5 Turbo"},
-            "ollama": {"llama2": "Llama 2", "codellama": "Code Llama"}
-        }
-        print(f"[DEBUG] Using fallback models for {provider}: {fallback_models.get(provider, {})}")
-        return {
-            "models": fallback_models.get(provider, {}),
-            "default": list(fallback_models.get(provider, {}).keys())[0] if fallback_models.get(provider) else None
-        }
+        return _models_fallback(provider)
+
+
+@dataclass(frozen=True)
+class LLMSettings:
+    """LLM settings from the environment (LLM_PROVIDER, LLM_MODEL, LLM_TEMPERATURE)"""
+    provider: str = "deepseek"
+    model: str = ""
+    temperature: float = 0.7
+
+    @classmethod
+    def from_env(cls) -> "LLMSettings":
+        return cls(
+            provider=os.getenv("LLM_PROVIDER", "deepseek").lower(),
+            model=os.getenv("LLM_MODEL", ""),
+            temperature=float(os.getenv("LLM_TEMPERATURE", "0.7"))
+        )
+
+
+# Loaded on first use (after src.core.llm has read .env), then swapped as a whole
+_llm_settings: Optional[LLMSettings] = None
+
+
+def reload_llm_settings() -> LLMSettings:
+    """Re-read the LLM settings from the environment"""
+    global _llm_settings
+    from src.core.llm.llm_providers import LLMProviderConfig
+
+    settings = LLMSettings.from_env()
+    if not settings.model:
+        settings = replace(
+            settings,
+            model=LLMProviderConfig.get_default_model_for_provider(settings.provider)
+        )
+    _llm_settings = settings
+    return settings
 
 
 @router.get("/llm/current")
 async def get_current_llm_config():
     """Get current LLM configuration"""
     try:
-        from src.core.llm.llm_providers import LLMProviderConfig
-        import os
+        settings = _llm_settings or reload_llm_settings()
 
-        current_provider = os.getenv("LLM_PROVIDER", "deepseek").lower()
-        current_model = os.getenv("LLM_MODEL", "")
-        temperature = float(os.getenv("LLM_TEMPERATURE", "0.7"))
-
-        if not current_model:
-            current_model = LLMProviderConfig.get_default_model_for_provider(current_provider)
-
-        print(f"[DEBUG] Current LLM config: provider={current_provider}, model={current_model}, temp={temperature}")
-        return {
-            "provider": current_provider,
-            "model": current_model,
-            "temperature": temperature
-        }
+        logger.debug("Current LLM config: %s", settings)
+        return asdict(settings)
     except Exception as e:
-        print(f"[ERROR] Failed to get current LLM config: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.error("Failed to get current LLM config: %s", e, exc_info=True)
         config = {
             "provider": "deepseek",
             "model": "deepseek-chat",
             "temperature": 0.7
         }
-        print(f"[DEBUG] Using fallback LLM config: {config}")
-        return config
\ No newline at end of file
+        logger.debug("Using fallback LLM config: %s", config)
+        return config
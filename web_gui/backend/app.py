@@ -3,14 +3,23 @@ FastAPI application for AgenticSys Web GUI
 Clean, modular architecture with WebSocket support
 """
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
-import json
+from fastapi.responses import HTMLResponse, JSONResponse, Response
+import orjson
 import asyncio
+from contextlib import asynccontextmanager
+import hashlib
+import atexit
+import logging
+from logging.handlers import QueueHandler, QueueListener
+import os
+import queue
+import re
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from datetime import datetime
 import sys
 
@@ -18,15 +27,103 @@ import sys
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
+
+class _DroppingQueueHandler(QueueHandler):
+    """Queue handler that drops records instead of raising when the queue is full"""
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass  # Console is far behind; losing log lines beats stalling the loop
+
+
+# Backend log output; verbosity is set with AGENTICSYS_LOG_LEVEL (default INFO).
+# Records are handed to a bounded queue and written by a listener thread, so
+# logging on the event loop never blocks on console I/O.
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter("[%(levelname)s] %(message)s"))
+_log_queue = queue.Queue(maxsize=10_000)
+_log_listener = QueueListener(_log_queue, _log_handler)
+logger = logging.getLogger("web_gui")
+logger.addHandler(_DroppingQueueHandler(_log_queue))
+_log_level = os.getenv("AGENTICSYS_LOG_LEVEL", "INFO").upper()
+logger.setLevel(_log_level)
+logger.propagate = False
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
 from .api.routes import router
 from .core.websocket import ConnectionManager
 from .core.orchestrator import SystemOrchestrator
+from .core.mcp_cache import close_mcp
+from .core.monitor import install_output_tee
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson instead of the stdlib encoder"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class CachedStaticFiles(StaticFiles):
+    """Static files with Cache-Control headers (long-lived for content-hashed assets)"""
+
+    HASHED_NAME = re.compile(r"[.-][0-9a-f]{8,}\.\w+$")
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if self.HASHED_NAME.search(str(full_path)):
+            response.headers["Cache-Control"] = "public, max-age=86400, immutable"
+        else:
+            response.headers["Cache-Control"] = "public, max-age=300"
+        return response
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize services on startup and clean them up on shutdown"""
+    global index_html, index_headers
+    # One persistent stdout/stderr tee, installed before anything else writes;
+    # agent captures only switch a context variable
+    install_output_tee()
+    logger.info("[STARTUP] AgenticSys Web GUI starting...")
+    # uvicorn's default --loop auto runs on uvloop when it is installed
+    loop = asyncio.get_running_loop()
+    logger.info("[STARTUP] Event loop: %s.%s", type(loop).__module__, type(loop).__name__)
+    # Cache the frontend page so GET / never touches the disk
+    if index_path.exists():
+        index_html = index_path.read_bytes()
+        index_headers = {
+            "ETag": f'"{hashlib.md5(index_html).hexdigest()}"',
+            "Cache-Control": "public, max-age=60"
+        }
+        logger.info("[STARTUP] Frontend cached")
+    logger.info("[STARTUP] WebSocket server ready")
+    logger.info("[STARTUP] API endpoints ready")
+    # Start WebSocket keepalive to prevent timeout disconnections
+    await ws_manager.start_keepalive()
+    logger.info("[STARTUP] System initialized")
+
+    yield
+
+    logger.info("[SHUTDOWN] Shutting down AgenticSys Web GUI...")
+    await ws_manager.stop_keepalive()
+    await ws_manager.stop_broadcaster()
+    await orchestrator.cleanup()
+    await close_mcp()
+    await ws_manager.disconnect_all()
+    await ws_manager.cancel_tasks()
+
 
 # Initialize FastAPI app
 app = FastAPI(
     title="AgenticSys Web GUI",
     description="Web interface for autonomous multi-agent system",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -38,71 +135,90 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress API responses and static assets
+app.add_middleware(GZipMiddleware, minimum_size=512)
+
 # Initialize managers
 ws_manager = ConnectionManager()
 orchestrator = SystemOrchestrator(ws_manager)
 
 # Include API routes (with fallback handling)
 try:
-    print("[DEBUG] Loading API routes...")
+    logger.debug("Loading API routes...")
     app.include_router(router, prefix="/api")
-    print(f"[DEBUG] Routes loaded: {[route.path for route in router.routes]}")
-    print(f"[DEBUG] Total routes: {len(router.routes)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Routes loaded: %s", [route.path for route in router.routes])
+    logger.debug("Total routes: %d", len(router.routes))
 except Exception as e:
-    print(f"[ERROR] Failed to load routes: {e}")
-    import traceback
-    traceback.print_exc()
-
-# Add LLM endpoints directly to ensure they're available
-@app.get("/api/llm/providers")
-async def get_llm_providers():
-    """Get available LLM providers"""
-    print("[DEBUG] LLM providers endpoint called")
-    return {
-        "providers": ["deepseek", "openai", "ollama"],
-        "default": "deepseek"
-    }
-
-@app.get("/api/llm/models/{provider}")
-async def get_llm_models(provider: str):
-    """Get available models for a specific provider"""
-    print(f"[DEBUG] LLM models endpoint called for provider: {provider}")
-    fallback_models = {
-        "deepseek": {"deepseek-chat": "DeepSeek Chat", "deepseek-coder": "DeepSeek Coder"},
-        "openai": {"gpt-4": "GPT-4", "gpt-3.5-turbo": "GPT-3.5 Turbo"},
-        "ollama": {"llama2": "Llama 2", "codellama": "Code Llama"}
-    }
-    return {
-        "models": fallback_models.get(provider, {}),
-        "default": list(fallback_models.get(provider, {}).keys())[0] if fallback_models.get(provider) else None
-    }
-
-@app.get("/api/llm/current")
-async def get_current_llm_config():
-    """Get current LLM configuration"""
-    print("[DEBUG] Current LLM config endpoint called")
-    import os
-    return {
-        "provider": os.getenv("LLM_PROVIDER", "deepseek").lower(),
-        "model": os.getenv("LLM_MODEL", "deepseek-chat"),
-        "temperature": float(os.getenv("LLM_TEMPERATURE", "0.7"))
-    }
+    logger.error("Failed to load routes: %s", e, exc_info=True)
 
 # Serve static files
 frontend_path = Path(__file__).parent.parent / "frontend"
 if frontend_path.exists():
-    app.mount("/static", StaticFiles(directory=str(frontend_path)), name="static")
+    app.mount("/static", CachedStaticFiles(directory=str(frontend_path)), name="static")
+
+# Frontend entry page, read once at startup
+index_path = frontend_path / "index.html"
+index_html: Optional[bytes] = None
+index_headers: Dict[str, str] = {}
 
 # Root endpoint - serve the frontend
 @app.get("/")
-async def root():
+async def root(request: Request):
     """Serve the main application"""
-    index_path = frontend_path / "index.html"
-    if index_path.exists():
-        with open(index_path, "r", encoding="utf-8") as f:
-            return HTMLResponse(content=f.read())
+    if index_html is not None:
+        if request.headers.get("if-none-match") == index_headers["ETag"]:
+            return Response(status_code=304, headers=index_headers)
+        return HTMLResponse(content=index_html, headers=index_headers)
     return {"message": "AgenticSys Web GUI API", "status": "running"}
 
+
+# Raw forms of the client keepalive ping, answered without parsing
+_PING_FRAMES = frozenset({'{"type":"ping"}', '{"type":"ping","data":{}}'})
+_PING_FRAMES |= {frame.encode() for frame in _PING_FRAMES}
+_PONG = orjson.dumps({"type": "pong"})
+
+
+async def _handle_ping(websocket: WebSocket, message: Dict[str, Any]):
+    await ws_manager.send_personal_message(_PONG, websocket)
+
+
+async def _handle_start_system(websocket: WebSocket, message: Dict[str, Any]):
+    # Start the orchestrator
+    config = message.get("data", {}).get("config", {})
+    logger.debug("WebSocket received config: %s", config)
+    await orchestrator.start(config)
+    # After orchestrator completes, send a completion signal
+    logger.info("[WS] Orchestrator completed, sending completion signal")
+    await ws_manager.send_personal_message(orjson.dumps({
+        "type": "orchestrator_complete",
+        "data": {"message": "All issues processed successfully"}
+    }), websocket)
+
+
+async def _handle_stop_system(websocket: WebSocket, message: Dict[str, Any]):
+    # Stop the orchestrator
+    await orchestrator.stop()
+
+
+async def _handle_get_status(websocket: WebSocket, message: Dict[str, Any]):
+    # Send current status
+    status = orchestrator.get_status()
+    await ws_manager.send_personal_message(orjson.dumps({
+        "type": "status_update",
+        "data": status
+    }), websocket)
+
+
+# Client message type -> handler
+WS_HANDLERS = {
+    "ping": _handle_ping,
+    "start_system": _handle_start_system,
+    "stop_system": _handle_stop_system,
+    "get_status": _handle_get_status,
+}
+
+
 # WebSocket endpoint for real-time updates
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
@@ -115,63 +231,45 @@ async def websocket_endpoint(websocket: WebSocket):
             # Check if WebSocket is still connected before trying to receive
             # This prevents RuntimeError when connection is closed
             if websocket.client_state.name != "CONNECTED":
-                print(f"[WS] Connection no longer active (state: {websocket.client_state.name}), breaking loop")
+                logger.debug("[WS] Connection no longer active (state: %s), breaking loop", websocket.client_state.name)
                 break
 
-            # Receive message from client
-            data = await websocket.receive_text()
-            message = json.loads(data)
-
-            # Handle different message types
-            if message["type"] == "ping":
-                await websocket.send_json({"type": "pong"})
-
-            elif message["type"] == "start_system":
-                # Start the orchestrator
-                config = message.get("data", {}).get("config", {})
-                print(f"[DEBUG] WebSocket received config: {config}")
-                await orchestrator.start(config)
-                # After orchestrator completes, send a completion signal
-                print("[WS] Orchestrator completed, sending completion signal")
-                await websocket.send_json({
-                    "type": "orchestrator_complete",
-                    "data": {"message": "All issues processed successfully"}
-                })
-
-            elif message["type"] == "stop_system":
-                # Stop the orchestrator
-                await orchestrator.stop()
-
-            elif message["type"] == "get_status":
-                # Send current status
-                status = orchestrator.get_status()
-                await websocket.send_json({
-                    "type": "status_update",
-                    "data": status
-                })
+            # Receive a text or binary frame from the client
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(frame.get("code", 1000), frame.get("reason"))
+            raw = frame.get("text") or frame.get("bytes")
+            if not raw:
+                continue
+
+            # Keepalive pings skip JSON parsing entirely
+            if raw in _PING_FRAMES:
+                await ws_manager.send_personal_message(_PONG, websocket)
+                continue
+
+            message = orjson.loads(raw)
+            handler = WS_HANDLERS.get(message.get("type"))
+            if handler:
+                await handler(websocket, message)
 
     except WebSocketDisconnect as e:
         # Extract close code and reason from WebSocketDisconnect exception
         close_code = e.code if hasattr(e, 'code') else None
         reason = e.reason if hasattr(e, 'reason') else str(e)
-        print(f"[WS] Client disconnected: ({close_code}, '{reason}')")
+        logger.info("[WS] Client disconnected: (%s, '%s')", close_code, reason)
         ws_manager.disconnect(websocket, reason=reason, close_code=close_code)
     except RuntimeError as e:
         # Handle RuntimeError that occurs when trying to receive from closed WebSocket
         if "WebSocket is not connected" in str(e) or "Need to call \"accept\" first" in str(e):
-            print(f"[WS] WebSocket connection closed unexpectedly: {e}")
+            logger.warning("[WS] WebSocket connection closed unexpectedly: %s", e)
             ws_manager.disconnect(websocket, reason=f"Connection closed: {str(e)}")
         else:
             # Re-raise if it's a different RuntimeError
-            print(f"[WS-ERROR] Unexpected RuntimeError in WebSocket handler: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("[WS-ERROR] Unexpected RuntimeError in WebSocket handler: %s", e)
             ws_manager.disconnect(websocket, reason=f"RuntimeError: {str(e)}")
             raise
     except Exception as e:
-        print(f"[WS-ERROR] Unhandled exception in WebSocket handler: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("[WS-ERROR] Unhandled exception in WebSocket handler: %s", e)
         ws_manager.disconnect(websocket, reason=f"Unhandled exception: {str(e)}")
 
 # Health check endpoint
@@ -205,27 +303,9 @@ async def get_ws_disconnection_summary():
 async def toggle_ws_debug_mode():
     """Toggle WebSocket debug mode"""
     ws_manager.debug_mode = not ws_manager.debug_mode
+    # Debug records from the whole backend only show up below the configured level
+    logger.setLevel(logging.DEBUG if ws_manager.debug_mode else _log_level)
     return {
         "debug_mode": ws_manager.debug_mode,
         "message": f"WebSocket debug mode {'enabled' if ws_manager.debug_mode else 'disabled'}"
     }
-
-# Startup event
-@app.on_event("startup")
-async def startup_event():
-    """Initialize services on startup"""
-    print("[STARTUP] AgenticSys Web GUI starting...")
-    print("[STARTUP] WebSocket server ready")
-    print("[STARTUP] API endpoints ready")
-    # Start WebSocket keepalive to prevent timeout disconnections
-    await ws_manager.start_keepalive()
-    print("[STARTUP] System initialized")
-
-# Shutdown event
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Clean up on shutdown"""
-    print("[SHUTDOWN] Shutting down AgenticSys Web GUI...")
-    await ws_manager.stop_keepalive()
-    await orchestrator.cleanup()
-    await ws_manager.disconnect_all()
\ No newline at end of file
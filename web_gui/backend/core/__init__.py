@@ -3,6 +3,9 @@
 from .websocket import ConnectionManager, ws_manager
 from .orchestrator import SystemOrchestrator, get_orchestrator
 from .monitor import AgentMonitor, ToolMonitor, wrap_tools_for_monitoring
+from .mcp_cache import get_mcp, get_mcp_tool, close_mcp
+from .cache import TTLCache, cached
+from .ratelimit import TokenBucket, rate_limited
 
 __all__ = [
     "ConnectionManager",
@@ -11,5 +14,12 @@ __all__ = [
     "get_orchestrator",
     "AgentMonitor",
     "ToolMonitor",
-    "wrap_tools_for_monitoring"
+    "wrap_tools_for_monitoring",
+    "get_mcp",
+    "get_mcp_tool",
+    "close_mcp",
+    "TTLCache",
+    "cached",
+    "TokenBucket",
+    "rate_limited"
 ]
\ No newline at end of file
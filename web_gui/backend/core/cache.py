@@ -0,0 +1,96 @@
+"""
+In-memory TTL cache for API responses
+Keeps slow-changing endpoint results (project lists, static metadata) for a fixed time
+"""
+
+import asyncio
+import functools
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """Async cache whose entries expire `ttl` seconds after they were stored"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._locks: Dict[Hashable, asyncio.Lock] = {}
+
+    def _get_fresh(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return (hit, value) for a key that has not expired yet"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return True, entry[1]
+        return False, None
+
+    async def get_or_set(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Get a cached value, computing it with `factory` on a miss.
+
+        Concurrent misses for the same key wait on a per-key lock, so the
+        factory runs once instead of once per waiting request.
+
+        Args:
+            key: Cache key
+            factory: Zero-argument coroutine function producing the value
+
+        Returns:
+            Cached or freshly computed value
+        """
+        hit, value = self._get_fresh(key)
+        if hit:
+            return value
+
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        try:
+            async with lock:
+                hit, value = self._get_fresh(key)
+                if hit:
+                    return value
+
+                value = await factory()
+                self._store(key, value)
+                return value
+        finally:
+            # Locks only live while a miss is in flight (waiters still hold the object)
+            if self._locks.get(key) is lock:
+                del self._locks[key]
+
+    def _store(self, key: Hashable, value: Any):
+        """Store a value, dropping expired entries"""
+        now = time.monotonic()
+        expired = [k for k, (expires, _) in self._entries.items() if expires <= now]
+        for k in expired:
+            del self._entries[k]
+        self._entries[key] = (now + self.ttl, value)
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """Drop one key, or every entry when no key is given"""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+
+def cached(ttl: float):
+    """
+    Cache an async endpoint's result for `ttl` seconds, keyed by its arguments.
+
+    The wrapper keeps the endpoint's signature (FastAPI still sees the
+    original parameters) and exposes its TTLCache as `.cache` for invalidation.
+    """
+    def decorator(func):
+        cache = TTLCache(ttl)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            return await cache.get_or_set(key, lambda: func(*args, **kwargs))
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
@@ -0,0 +1,93 @@
+"""
+Process-wide MCP tool cache for the API routes
+Loads the GitLab MCP tools once and indexes them by name
+"""
+
+import asyncio
+from typing import Dict, Any, Optional, Tuple
+
+# Tools indexed by name, plus the client that owns them
+_tools_by_name: Optional[Dict[str, Any]] = None
+_tools_by_capability: Dict[str, Any] = {}
+_client: Any = None
+_lock = asyncio.Lock()
+
+# Capability -> name fragments; the first tool whose name matches one wins
+CAPABILITIES = {
+    'file_reader': ('get_file', 'repository_tree'),
+}
+
+
+def _classify(tools: Dict[str, Any]) -> Dict[str, Any]:
+    """Map each capability to the first tool whose name matches it"""
+    by_capability = {}
+    for name, tool in tools.items():
+        lowered = name.lower()
+        for capability, fragments in CAPABILITIES.items():
+            if capability not in by_capability and any(f in lowered for f in fragments):
+                by_capability[capability] = tool
+    return by_capability
+
+
+async def get_mcp() -> Tuple[Dict[str, Any], Any]:
+    """
+    Get the cached MCP tools (indexed by name) and client.
+
+    The first call loads the tools; concurrent callers wait on a lock
+    instead of opening their own connection.
+
+    Returns:
+        Tuple of (tools by name, MCP client instance)
+    """
+    global _tools_by_name, _tools_by_capability, _client
+
+    if _tools_by_name is None:
+        async with _lock:
+            if _tools_by_name is None:
+                # Imported lazily so the API still loads without MCP dependencies
+                from src.infrastructure.mcp_client import load_mcp_tools
+
+                tools, client = await load_mcp_tools()
+                _client = client
+                by_name = {tool.name: tool for tool in tools if hasattr(tool, 'name')}
+                _tools_by_capability = _classify(by_name)
+                _tools_by_name = by_name
+
+    return _tools_by_name, _client
+
+
+async def get_mcp_tool(capability: str) -> Optional[Any]:
+    """
+    Get the cached MCP tool providing a capability (see CAPABILITIES).
+
+    Returns:
+        The tool, or None if no loaded tool provides it
+    """
+    await get_mcp()
+    return _tools_by_capability.get(capability)
+
+
+def _reset_index():
+    """Drop the tool index and capability map (call together with clear_mcp_cache)"""
+    global _tools_by_name, _tools_by_capability, _client
+
+    _tools_by_name = None
+    _tools_by_capability = {}
+    _client = None
+
+
+async def close_mcp():
+    """Close the cached MCP client and drop the tool index"""
+    async with _lock:
+        client = _client
+        if client is None:
+            return
+
+        from src.infrastructure.mcp_client import SafeMCPClient, clear_mcp_cache
+
+        # Reset both caches before awaiting the close, so a get_mcp call that
+        # runs meanwhile reconnects instead of re-indexing the closing client
+        clear_mcp_cache()
+        _reset_index()
+
+    await SafeMCPClient(client).close()
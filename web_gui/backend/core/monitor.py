@@ -3,32 +3,184 @@ Monitoring utilities for capturing agent outputs and tool usage
 """
 
 import sys
-import io
+import re
+import reprlib
 import time
 import asyncio
-from typing import Dict, Any, Optional
+import itertools
+from typing import Dict, Any, Optional, Tuple
+from collections import defaultdict, deque
 from contextlib import contextmanager
-from datetime import datetime
+from contextvars import ContextVar
+from dataclasses import dataclass
 import threading
 
+try:
+    import hyperscan
+except ImportError:  # optional - markers are then matched with the compiled regex
+    hyperscan = None
+
+
+# Output containing any of these is sent immediately, matched in one regex pass
+IMPORTANT_MARKERS = (
+    "[TOOL]", "[MCP]", "[DONE]", "Reading:", "Creating:", "Updating:",
+    "list_issues", "get_file_contents", "get_repo_tree", "create_or_update_file",
+    "list_branches", "list_merge_requests", "get_project", "get_issue"
+)
+_IMPORTANT_RE = re.compile("|".join(map(re.escape, IMPORTANT_MARKERS)))
+
+
+def _compile_marker_db():
+    """Compile the markers into a Hyperscan block-mode database, if available"""
+    if hyperscan is None:
+        return None
+    db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+    db.compile(
+        expressions=[re.escape(m).encode() for m in IMPORTANT_MARKERS],
+        ids=list(range(len(IMPORTANT_MARKERS))),
+        flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(IMPORTANT_MARKERS)
+    )
+    return db
+
+
+_MARKER_DB = _compile_marker_db()
+
+# Shorter output is matched with the regex; Hyperscan's per-call overhead
+# only pays off above ~100 characters (0.2us vs 0.5us at 16 chars, 5.7us vs 0.6us at 1 KiB)
+HYPERSCAN_MIN_CHARS = 128
+
+# Hyperscan scratch space must not be shared between threads
+_scratch = threading.local()
+
+
+def _stop_scan(marker_id, start, end, flags, context):
+    return True  # Stop at the first marker
+
+
+def is_important(text: str) -> bool:
+    """Whether output contains an important marker and must be sent immediately"""
+    if _MARKER_DB is None or len(text) < HYPERSCAN_MIN_CHARS:
+        return _IMPORTANT_RE.search(text) is not None
+
+    scratch = getattr(_scratch, "value", None)
+    if scratch is None:
+        scratch = _scratch.value = hyperscan.Scratch(_MARKER_DB)
+    try:
+        # surrogatepass: captured writes may hold lone surrogates (the markers are ASCII)
+        _MARKER_DB.scan(text.encode("utf-8", "surrogatepass"), match_event_handler=_stop_scan, scratch=scratch)
+    except hyperscan.ScanTerminated:
+        return True
+    return False
+
+
+# Per-agent history kept for outputs and tool calls (oldest entries are dropped)
+MAX_RECORDS_PER_AGENT = 10_000
+
+# Tool results are cut to this many characters before they are sent to clients
+TOOL_OUTPUT_PREVIEW_CHARS = 4096
+
+
+# Bounded formatter for non-text results: long strings and containers are cut while formatting
+_preview_repr = reprlib.Repr()
+_preview_repr.maxstring = _preview_repr.maxother = TOOL_OUTPUT_PREVIEW_CHARS
+_preview_repr.maxlist = _preview_repr.maxtuple = _preview_repr.maxdict = 64
+_preview_repr.maxset = _preview_repr.maxfrozenset = _preview_repr.maxdeque = 64
+_preview_repr.maxlevel = 4
+
+
+def _output_preview(output: Any) -> Optional[str]:
+    """Truncated text of a tool result (whole files would otherwise be copied into every event)"""
+    if not output:
+        return None
+    # Tool messages carry their text in .content
+    content = getattr(output, "content", None)
+    if isinstance(content, str):
+        output = content
+    if isinstance(output, str):
+        return output[:TOOL_OUTPUT_PREVIEW_CHARS]
+    if isinstance(output, (bytes, bytearray)):
+        return bytes(output[:TOOL_OUTPUT_PREVIEW_CHARS]).decode("utf-8", "replace")
+    return _preview_repr.repr(output)[:TOOL_OUTPUT_PREVIEW_CHARS]
+
+
+@dataclass(slots=True)
+class OutputRecord:
+    """One recorded agent output"""
+    timestamp: float  # Epoch seconds
+    content: str
+    level: str
+
+
+@dataclass(slots=True)
+class ToolCallRecord:
+    """One completed tool call"""
+    tool: str
+    duration_ms: int
+    success: bool
+    timestamp: float  # Epoch seconds
+
+
+# Where stdout/stderr writes go in the current context (None = the real streams).
+# asyncio tasks inherit it, so concurrent captures do not see each other's output.
+_output_sink: ContextVar[Optional[Any]] = ContextVar("output_sink", default=None)
+_tee_lock = threading.Lock()
+_real_stdout = None
+
+
+class _StreamTee:
+    """Persistent sys.stdout/sys.stderr replacement dispatching on _output_sink"""
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def write(self, text: str) -> int:
+        sink = _output_sink.get()
+        if sink is None:
+            return self._stream.write(text)
+        sink.write(text)
+        return len(text)
+
+    def flush(self):
+        sink = _output_sink.get()
+        (self._stream if sink is None else sink).flush()
+
+    def __getattr__(self, name):
+        # encoding, isatty, fileno, ... come from the real stream
+        return getattr(self._stream, name)
+
+
+def install_output_tee():
+    """Install the stdout/stderr tee once per process (idempotent)"""
+    global _real_stdout
+    if _real_stdout is not None:
+        return
+    with _tee_lock:
+        if _real_stdout is None:
+            # Wrap the interpreter's own streams, never another wrapper that
+            # happens to be installed in sys.stdout at this point
+            _real_stdout = sys.__stdout__ or sys.stdout
+            sys.stdout = _StreamTee(_real_stdout)
+            sys.stderr = _StreamTee(sys.__stderr__ or sys.stderr)
+
 
 class OutputCapture:
-    """Captures stdout/stderr output and sends it via WebSocket - OPTIMIZED"""
+    """Captures stdout/stderr output of the current context and sends it via WebSocket - OPTIMIZED"""
 
     def __init__(self, ws_manager, agent_name: str):
         self.ws_manager = ws_manager
         self.agent_name = agent_name
-        self.original_stdout = None
-        self.original_stderr = None
-        self.sentence_buffer = ""  # Buffer to accumulate text
+        self.original_stdout = None  # Where writes are passed through to
+        self._token = None  # _output_sink reset token while capturing
+        self._chunks = []  # Written text, joined only when sent
+        self._chunk_len = 0  # Total length of the buffered chunks
         self.batch_buffer = []  # Batch multiple messages
-        self.write_count = 0  # Track writes for time check throttling
-        self.last_send_time = time.time()
         self.send_interval = 0.2  # Send every 0.2 seconds for better responsiveness
+        self._timer: Optional[asyncio.TimerHandle] = None  # Periodic flush on the event loop
+        self._timer_loop: Optional[asyncio.AbstractEventLoop] = None
         self.batch_size = 2  # Send every 2 messages (reduced for visibility)
 
     def write(self, text: str):
-        """Write method for stdout/stderr replacement - OPTIMIZED"""
+        """Write method called by the stdout/stderr tee - OPTIMIZED"""
         # Write to original stdout
         if self.original_stdout:
             self.original_stdout.write(text)
@@ -38,63 +190,55 @@ class OutputCapture:
             return
 
         # Accumulate text
-        self.sentence_buffer += text
-        self.write_count += 1
+        self._chunks.append(text)
+        self._chunk_len += len(text)
 
         # CRITICAL: Immediate send for tool calls and important progress markers
-        important_markers = [
-            "[TOOL]", "[MCP]", "[DONE]", "Reading:", "Creating:", "Updating:",
-            "list_issues", "get_file_contents", "get_repo_tree", "create_or_update_file",
-            "list_branches", "list_merge_requests", "get_project", "get_issue"
-        ]
-        is_important = any(marker in text for marker in important_markers)
-
-        if is_important:
-            # Force immediate send for visibility
-            if self.sentence_buffer.strip():
-                self._batch_and_send()
-                self._send_batch()  # Force immediate WebSocket send
+        if is_important(text):
+            # Force immediate WebSocket send for visibility
+            self._send_pending()
             return
 
-        # Simplified send logic - prioritize responsiveness
-        should_send = False
-        buffer_len = len(self.sentence_buffer)
-
-        if '\n' in text:  # Immediate send on newline
-            should_send = True
-        elif buffer_len >= 100:  # Force send on moderate buffer
-            should_send = True
-        else:
-            # Check time periodically (every 20 writes for balance)
-            if self.write_count % 20 == 0:
-                current_time = time.time()
-                if current_time - self.last_send_time > self.send_interval:
-                    should_send = True
-                    self.last_send_time = current_time
-
-        if should_send and self.sentence_buffer.strip():
+        # Simplified send logic - prioritize responsiveness. The buffer size
+        # needs no scan, so it is checked before looking for a newline.
+        # Anything left over is picked up by the periodic timer flush.
+        if self._chunk_len >= 100 or text.find('\n') >= 0:
             self._batch_and_send()
 
+    def _on_timer(self):
+        """Periodic flush so idle output does not wait for the next write"""
+        self._send_pending()
+        self._timer = self._timer_loop.call_later(self.send_interval, self._on_timer)
+
     def flush(self):
-        """Flush method for stdout/stderr replacement"""
+        """Flush method called by the stdout/stderr tee"""
         if self.original_stdout:
             self.original_stdout.flush()
-        # Force send remaining buffer
-        if self.sentence_buffer.strip():
-            self._batch_and_send()
-        # Send any remaining batched messages
-        if self.batch_buffer:
-            self._send_batch()
+        self._send_pending()
+
+    def _send_pending(self):
+        """Send buffered text and batched messages in one message"""
+        self._batch_and_send()
+        self._send_batch()
 
     def _batch_and_send(self):
         """Add to batch and send if batch is full - OPTIMIZED"""
-        if self.sentence_buffer.strip():
-            self.batch_buffer.append(self.sentence_buffer)
-            self.sentence_buffer = ""
+        if not self._chunks:
+            return
 
-            # Send batch if full
-            if len(self.batch_buffer) >= self.batch_size:
-                self._send_batch()
+        text = "".join(self._chunks)
+        if not text.strip():
+            # Whitespace only so far - keep it until real text follows
+            self._chunks = [text]
+            return
+
+        self._chunks = []
+        self._chunk_len = 0
+        self.batch_buffer.append(text)
+
+        # Send batch if full
+        if len(self.batch_buffer) >= self.batch_size:
+            self._send_batch()
 
     def _send_batch(self):
         """Send batched messages via WebSocket - NON-BLOCKING"""
@@ -105,40 +249,43 @@ class OutputCapture:
         combined_output = "\n".join(self.batch_buffer)
         self.batch_buffer = []
 
-        # Create fire-and-forget task (async-safe)
-        try:
-            # Try to get the current event loop
-            loop = asyncio.get_running_loop()
-            # Schedule the coroutine to run in the event loop
-            asyncio.run_coroutine_threadsafe(
-                self.ws_manager.send_agent_output(
-                    self.agent_name,
-                    combined_output,
-                    "info"
-                ),
-                loop
-            )
-        except RuntimeError:
-            # No event loop - save for later or write to original stdout
+        # Hand off to the manager's broadcast queue (thread-safe, non-blocking)
+        posted = self.ws_manager.post_event("agent_output", {
+            "agent": self.agent_name,
+            "content": combined_output,
+            "level": "info"
+        })
+        if not posted:
+            # No event loop - write to original stdout
             if self.original_stdout:
                 self.original_stdout.write(f"[{self.agent_name}] {combined_output}\n")
 
     def __enter__(self):
-        """Start capturing output"""
-        self.original_stdout = sys.stdout
-        self.original_stderr = sys.stderr
-        sys.stdout = self
-        sys.stderr = self
+        """Start capturing output in the current context"""
+        install_output_tee()
+        # Pass writes through to the enclosing capture, or the console
+        self.original_stdout = _output_sink.get() or _real_stdout
+        self._token = _output_sink.set(self)
+
+        # Time-based flushing runs on the event loop, so write() never reads the clock
+        try:
+            self._timer_loop = asyncio.get_running_loop()
+            self._timer = self._timer_loop.call_later(self.send_interval, self._on_timer)
+        except RuntimeError:
+            self._timer = None  # No event loop - newline/size triggers and exit flush only
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Stop capturing output"""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
         # Send any remaining output (uses flush which handles both buffers)
         self.flush()
 
-        # Restore original stdout/stderr
-        sys.stdout = self.original_stdout
-        sys.stderr = self.original_stderr
+        # Hand the context back to the enclosing sink
+        _output_sink.reset(self._token)
 
 
 class AgentMonitor:
@@ -146,30 +293,22 @@ class AgentMonitor:
 
     def __init__(self, ws_manager):
         self.ws_manager = ws_manager
-        self.agent_start_times: Dict[str, datetime] = {}
-        self.agent_outputs: Dict[str, list] = {}
+        self.agent_start_times: Dict[str, float] = {}
+        self.agent_outputs: Dict[str, deque] = defaultdict(lambda: deque(maxlen=MAX_RECORDS_PER_AGENT))
 
     @contextmanager
     def capture_output(self, agent_name: str):
         """Context manager to capture agent output"""
         # Record start time
-        self.agent_start_times[agent_name] = datetime.now()
+        start_time = time.time()
+        self.agent_start_times[agent_name] = start_time
 
-        # Send agent start event (async-safe)
-        try:
-            loop = asyncio.get_running_loop()
-            asyncio.run_coroutine_threadsafe(
-                self.ws_manager.send_event("agent_start", {
-                    "agent": agent_name,
-                    "timestamp": datetime.now().isoformat()
-                }),
-                loop
-            )
-        except RuntimeError:
-            # No event loop - skip WebSocket send
-            pass
+        # Send agent start event (thread-safe, skipped without an event loop)
+        self.ws_manager.post_event("agent_start", {
+            "agent": agent_name,
+            "timestamp": start_time
+        })
 
-        # Capture output
         capture = OutputCapture(self.ws_manager, agent_name)
 
         try:
@@ -177,53 +316,35 @@ class AgentMonitor:
                 yield
         finally:
             # Calculate duration
-            duration = (datetime.now() - self.agent_start_times[agent_name]).total_seconds()
-
-            # Send agent complete event (async-safe)
-            try:
-                loop = asyncio.get_running_loop()
-                asyncio.run_coroutine_threadsafe(
-                    self.ws_manager.send_event("agent_complete", {
-                        "agent": agent_name,
-                        "duration": duration,
-                        "timestamp": datetime.now().isoformat()
-                    }),
-                    loop
-                )
-            except RuntimeError:
-                # No event loop - skip WebSocket send
-                pass
+            end_time = time.time()
+            duration = end_time - self.agent_start_times[agent_name]
+
+            # Send agent complete event (thread-safe, skipped without an event loop)
+            self.ws_manager.post_event("agent_complete", {
+                "agent": agent_name,
+                "duration": duration,
+                "timestamp": end_time
+            })
 
     def record_output(self, agent_name: str, output: str, level: str = "info"):
         """Record agent output"""
-        if agent_name not in self.agent_outputs:
-            self.agent_outputs[agent_name] = []
+        self.agent_outputs[agent_name].append(OutputRecord(time.time(), output, level))
 
-        self.agent_outputs[agent_name].append({
-            "timestamp": datetime.now(),
+        # Send via WebSocket (thread-safe, skipped without an event loop)
+        self.ws_manager.post_event("agent_output", {
+            "agent": agent_name,
             "content": output,
             "level": level
         })
 
-        # Send via WebSocket (async-safe)
-        try:
-            loop = asyncio.get_running_loop()
-            asyncio.run_coroutine_threadsafe(
-                self.ws_manager.send_agent_output(agent_name, output, level),
-                loop
-            )
-        except RuntimeError:
-            # No event loop - skip WebSocket send
-            pass
-
     def get_agent_outputs(self, agent_name: str) -> list:
         """Get all outputs for a specific agent"""
-        return self.agent_outputs.get(agent_name, [])
+        return list(self.agent_outputs.get(agent_name, ()))
 
     def clear_agent_outputs(self, agent_name: str):
         """Clear outputs for a specific agent"""
         if agent_name in self.agent_outputs:
-            self.agent_outputs[agent_name] = []
+            self.agent_outputs[agent_name].clear()
 
 
 class ToolMonitor:
@@ -231,141 +352,113 @@ class ToolMonitor:
 
     def __init__(self, ws_manager):
         self.ws_manager = ws_manager
-        self.tool_calls: Dict[str, list] = {}
-        self.tool_timings: Dict[str, float] = {}
+        self.tool_calls: Dict[str, deque] = defaultdict(lambda: deque(maxlen=MAX_RECORDS_PER_AGENT))
+        self.tool_timings: Dict[int, Tuple[str, str, int]] = {}  # handle -> (agent, tool, start perf_counter_ns)
+        self._next_handle = itertools.count().__next__
+        # Per-agent running totals, updated as each call ends
+        self._stats: Dict[str, Dict[str, Any]] = defaultdict(
+            lambda: {"total": 0, "successful": 0, "duration_ms": 0, "tools": set()}
+        )
 
-    def record_tool_start(self, agent: str, tool: str, input_data: Dict[str, Any]):
-        """Record the start of a tool call"""
-        key = f"{agent}:{tool}:{time.time()}"
-        self.tool_timings[key] = time.time()
+    def record_tool_start(self, agent: str, tool: str, input_data: Optional[Dict[str, Any]] = None) -> int:
+        """Record the start of a tool call, returning a handle for record_tool_end"""
+        now = time.time()  # Wall clock for the event only; durations use the monotonic counter
+        handle = self._next_handle()
+        self.tool_timings[handle] = (agent, tool, time.perf_counter_ns())
 
-        # Send tool start event (async-safe)
-        try:
-            loop = asyncio.get_running_loop()
-            asyncio.run_coroutine_threadsafe(
-                self.ws_manager.send_event("tool_start", {
-                    "agent": agent,
-                    "tool": tool,
-                    "input": input_data,
-                    "timestamp": datetime.now().isoformat()
-                }),
-                loop
-            )
-        except RuntimeError:
-            # No event loop - skip WebSocket send
-            pass
+        # Send tool start event (thread-safe, skipped without an event loop)
+        self.ws_manager.post_event("tool_start", {
+            "agent": agent,
+            "tool": tool,
+            "input": input_data,
+            "timestamp": now
+        })
 
-        return key
+        return handle
 
-    def record_tool_end(self, key: str, output: Any = None, success: bool = True):
+    def record_tool_end(self, handle: int, output: Any = None, success: bool = True):
         """Record the end of a tool call"""
-        if key not in self.tool_timings:
+        entry = self.tool_timings.pop(handle, None)
+        if entry is None:
             return
 
-        start_time = self.tool_timings[key]
-        duration_ms = int((time.time() - start_time) * 1000)
+        agent, tool, start_ns = entry
+        duration_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
+        now = time.time()
 
-        parts = key.split(":", 2)
-        agent = parts[0]
-        tool = parts[1]
+        # Update running totals
+        stats = self._stats[agent]
+        stats["total"] += 1
+        stats["successful"] += bool(success)
+        stats["duration_ms"] += duration_ms
+        stats["tools"].add(tool)
 
         # Store tool call record
-        if agent not in self.tool_calls:
-            self.tool_calls[agent] = []
+        self.tool_calls[agent].append(ToolCallRecord(tool, duration_ms, success, now))
 
-        self.tool_calls[agent].append({
+        # Send tool end event (thread-safe, skipped without an event loop)
+        self.ws_manager.post_event("tool_end", {
+            "agent": agent,
             "tool": tool,
+            "output": _output_preview(output),
             "duration_ms": duration_ms,
             "success": success,
-            "timestamp": datetime.now()
+            "timestamp": now
         })
 
-        # Send tool end event (async-safe)
-        try:
-            loop = asyncio.get_running_loop()
-            asyncio.run_coroutine_threadsafe(
-                self.ws_manager.send_event("tool_end", {
-                    "agent": agent,
-                    "tool": tool,
-                    "output": str(output) if output else None,
-                    "duration_ms": duration_ms,
-                    "success": success,
-                    "timestamp": datetime.now().isoformat()
-                }),
-                loop
-            )
-        except RuntimeError:
-            # No event loop - skip WebSocket send
-            pass
-
-        # Clean up timing record
-        del self.tool_timings[key]
-
     def get_tool_stats(self, agent: str = None) -> Dict[str, Any]:
-        """Get tool usage statistics"""
+        """Get tool usage statistics (from running counters, not the call history)"""
         if agent:
-            calls = self.tool_calls.get(agent, [])
+            stats = [self._stats[agent]] if agent in self._stats else []
         else:
-            calls = []
-            for agent_calls in self.tool_calls.values():
-                calls.extend(agent_calls)
+            stats = list(self._stats.values())
 
-        if not calls:
+        total = sum(s["total"] for s in stats)
+        if not total:
             return {
                 "total_calls": 0,
                 "success_rate": 0,
                 "avg_duration_ms": 0
             }
 
-        total = len(calls)
-        successful = sum(1 for c in calls if c["success"])
-        avg_duration = sum(c["duration_ms"] for c in calls) / total
+        successful = sum(s["successful"] for s in stats)
+        duration_sum = sum(s["duration_ms"] for s in stats)
 
         return {
             "total_calls": total,
             "success_rate": (successful / total) * 100,
-            "avg_duration_ms": avg_duration,
-            "tools_used": list(set(c["tool"] for c in calls))
+            "avg_duration_ms": duration_sum / total,
+            "tools_used": list(set().union(*(s["tools"] for s in stats)))
         }
 
 
-class ToolWrapper:
-    """Wraps MCP tools to monitor their usage"""
+def _wrap_tool(original_tool, tool_monitor: ToolMonitor, agent_name: str):
+    """Wrap one tool so its calls are recorded (closure - no per-call attribute lookups)"""
+    tool_name = getattr(original_tool, "name", str(original_tool))
+    record_start = tool_monitor.record_tool_start
+    record_end = tool_monitor.record_tool_end
+    ws_manager = tool_monitor.ws_manager
 
-    def __init__(self, original_tool, tool_monitor: ToolMonitor, agent_name: str):
-        self.original_tool = original_tool
-        self.tool_monitor = tool_monitor
-        self.agent_name = agent_name
-        self.tool_name = getattr(original_tool, "name", str(original_tool))
-
-    async def __call__(self, *args, **kwargs):
-        """Execute the tool with monitoring"""
-        # Record tool start
-        key = self.tool_monitor.record_tool_start(
-            self.agent_name,
-            self.tool_name,
-            {"args": args, "kwargs": kwargs}
-        )
+    async def wrapped(*args, **kwargs):
+        # Arguments are only captured while a dashboard is connected to see them
+        input_data = {"args": args, "kwargs": kwargs} if ws_manager.has_clients else None
+        handle = record_start(agent_name, tool_name, input_data)
 
         try:
-            # Execute original tool
-            result = await self.original_tool(*args, **kwargs)
-
-            # Record success
-            self.tool_monitor.record_tool_end(key, result, True)
+            result = await original_tool(*args, **kwargs)
+        except BaseException as e:
+            # Failures and cancellations both close the timing entry
+            record_end(handle, str(e), False)
+            raise
 
-            return result
+        record_end(handle, result, True)
+        return result
 
-        except Exception as e:
-            # Record failure
-            self.tool_monitor.record_tool_end(key, str(e), False)
-            raise
+    wrapped.original_tool = original_tool
+    wrapped.tool_name = tool_name
+    return wrapped
 
 
 def wrap_tools_for_monitoring(tools: list, tool_monitor: ToolMonitor, agent_name: str) -> list:
     """Wrap a list of tools with monitoring"""
-    wrapped_tools = []
-    for tool in tools:
-        wrapped = ToolWrapper(tool, tool_monitor, agent_name)
-        wrapped_tools.append(wrapped)
-    return wrapped_tools
\ No newline at end of file
+    return [_wrap_tool(tool, tool_monitor, agent_name) for tool in tools]
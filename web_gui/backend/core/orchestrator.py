@@ -7,19 +7,46 @@ import asyncio
 import sys
 from typing import Dict, Any, Optional
 from datetime import datetime
+from dataclasses import dataclass
 from pathlib import Path
-import traceback
-import io
+import logging
 import os
-from contextlib import redirect_stdout, redirect_stderr
 
 # Add project root to path
 project_root = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 from src.orchestrator.supervisor import Supervisor
-from .websocket import ConnectionManager
+from src.core.llm.config import Config
+from .websocket import ConnectionManager, ws_manager
 from .monitor import AgentMonitor, ToolMonitor
+from ..api.models import ExecutionMode
+
+logger = logging.getLogger(__name__)
+
+# Web GUI execution modes -> supervisor modes. ExecutionMode is a str enum,
+# so raw mode strings from WebSocket configs hit the same keys.
+_SUPERVISOR_MODES = {
+    ExecutionMode.IMPLEMENT_ALL: "implement",
+    ExecutionMode.SINGLE_ISSUE: "implement",
+    ExecutionMode.ANALYSIS_ONLY: "analyze",
+}
+
+
+@dataclass(slots=True)
+class PipelineStats:
+    """Pipeline counters; incremented as plain attributes, snapshotted on demand"""
+    total_issues: int = 0
+    processed_issues: int = 0
+    successful_issues: int = 0
+    failed_issues: int = 0
+    total_time: int = 0
+    agent_calls: int = 0
+    tool_calls: int = 0
+
+    def snapshot(self) -> Dict[str, int]:
+        """Copy of the counters for status payloads"""
+        return {name: getattr(self, name) for name in self.__slots__}
 
 
 class SystemOrchestrator:
@@ -41,14 +68,16 @@ class SystemOrchestrator:
         self.tool_monitor = ToolMonitor(ws_manager)
 
         # Statistics
-        self.stats = {
-            "total_issues": 0,
-            "processed_issues": 0,
-            "successful_issues": 0,
-            "failed_issues": 0,
-            "total_time": 0,
-            "agent_calls": 0,
-            "tool_calls": 0
+        self.stats = PipelineStats()
+        self._progress = 0.0  # Cached by _refresh_rates when the counters change
+        self._success_rate = 0.0
+
+        # Pipeline stage -> bound runner
+        self._stage_runners = {
+            "planning": self._run_planning,
+            "coding": self._run_coding,
+            "testing": self._run_testing,
+            "review": self._run_review,
         }
 
     async def start(self, config: Dict[str, Any]):
@@ -78,8 +107,7 @@ class SystemOrchestrator:
 
         except Exception as e:
             error_msg = f"System error: {str(e)}"
-            print(f"[ERROR] {error_msg}")
-            traceback.print_exc()
+            logger.exception("[ERROR] %s", error_msg)
             await self.ws_manager.send_error(error_msg)
         finally:
             self.running = False
@@ -108,36 +136,8 @@ class SystemOrchestrator:
 
         await self.ws_manager.send_success("System stopped")
 
-    async def _execute_supervisor_like_cli(self, config: Dict[str, Any]):
-        """Execute supervisor using the same pattern as CLI"""
-        project_id = config.get("project_id")
-        print(f"[DEBUG] Received config in _execute_supervisor_like_cli: {config}")
-        print(f"[DEBUG] Extracted project_id: {project_id}")
-
-        if not project_id:
-            raise ValueError("Project ID is required to initialize the system")
-
-        # Tech stack will be auto-detected (None triggers detection in Supervisor)
-        tech_stack = config.get("tech_stack")  # Will be None - auto-detect
-        mode = config.get("mode", "implement_all")
-        specific_issue = config.get("specific_issue")
-
-        # Map web GUI modes to supervisor modes
-        if mode == "implement_all":
-            supervisor_mode = "implement"
-        elif mode == "single_issue":
-            supervisor_mode = "implement"
-        elif mode == "analysis":
-            supervisor_mode = "analyze"
-        else:
-            supervisor_mode = "implement"
-
-        await self.ws_manager.send_agent_output(
-            "System",
-            f"Initializing supervisor for project {project_id}",
-            "info"
-        )
-
+    def _apply_llm_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply the GUI's LLM selections to the environment and Config, returning them"""
         # ===================================================================
         # FIX: Extract LLM config from nested structure sent by frontend
         # Frontend sends: config['llm_config'] = {provider, model, temperature}
@@ -150,14 +150,10 @@ class SystemOrchestrator:
         llm_model = llm_config_from_gui.get('model', os.getenv('LLM_MODEL', 'deepseek-chat'))
         llm_temperature = llm_config_from_gui.get('temperature', float(os.getenv('LLM_TEMPERATURE', '0.7')))
 
-        # Debug logging with prominent banner
-        print("\n" + "="*70)
-        print("[LLM CONFIG] Applying GUI selections:")
-        print("="*70)
-        print(f"  Provider: {llm_provider}")
-        print(f"  Model: {llm_model}")
-        print(f"  Temperature: {llm_temperature}")
-        print("="*70 + "\n")
+        logger.info(
+            "[LLM CONFIG] Applying GUI selections: provider=%s model=%s temperature=%s",
+            llm_provider, llm_model, llm_temperature
+        )
 
         # ===================================================================
         # FIX: Update environment variables BEFORE supervisor initialization
@@ -165,15 +161,15 @@ class SystemOrchestrator:
         # ===================================================================
         if llm_provider:
             os.environ['LLM_PROVIDER'] = str(llm_provider)
-            print(f"[LLM CONFIG] Set LLM_PROVIDER={llm_provider}")
+            logger.debug("[LLM CONFIG] Set LLM_PROVIDER=%s", llm_provider)
 
         if llm_model:
             os.environ['LLM_MODEL'] = str(llm_model)
-            print(f"[LLM CONFIG] Set LLM_MODEL={llm_model}")
+            logger.debug("[LLM CONFIG] Set LLM_MODEL=%s", llm_model)
 
         if llm_temperature is not None:
             os.environ['LLM_TEMPERATURE'] = str(llm_temperature)
-            print(f"[LLM CONFIG] Set LLM_TEMPERATURE={llm_temperature}")
+            logger.debug("[LLM CONFIG] Set LLM_TEMPERATURE=%s", llm_temperature)
 
         # ===================================================================
         # CRITICAL FIX: Directly update Config class variables
@@ -181,29 +177,56 @@ class SystemOrchestrator:
         # (base_agent.py has: from src.core.llm.config import Config)
         # So we must update the Config class variables directly!
         # ===================================================================
-        from src.core.llm.config import Config
-
         if llm_provider:
             Config.LLM_PROVIDER = llm_provider
-            print(f"[LLM CONFIG] Updated Config.LLM_PROVIDER={llm_provider}")
+            logger.debug("[LLM CONFIG] Updated Config.LLM_PROVIDER=%s", llm_provider)
 
         if llm_model:
             Config.LLM_MODEL = llm_model
-            print(f"[LLM CONFIG] Updated Config.LLM_MODEL={llm_model}")
+            logger.debug("[LLM CONFIG] Updated Config.LLM_MODEL=%s", llm_model)
 
         if llm_temperature is not None:
             Config.LLM_TEMPERATURE = llm_temperature
-            print(f"[LLM CONFIG] Updated Config.LLM_TEMPERATURE={llm_temperature}")
+            logger.debug("[LLM CONFIG] Updated Config.LLM_TEMPERATURE=%s", llm_temperature)
 
-        print(f"\n[LLM CONFIG] Config class updated - agents will use GUI selections\n")
+        logger.info("[LLM CONFIG] Config class updated - agents will use GUI selections")
 
-        # Prepare LLM configuration for analytics (using extracted values)
-        llm_config = {
+        # Refresh the snapshot served by /api/llm/current (imported lazily, routes imports us)
+        from ..api.routes import reload_llm_settings
+        reload_llm_settings()
+
+        # LLM configuration for analytics (using extracted values)
+        return {
             'provider': llm_provider,
             'model': llm_model,
             'temperature': llm_temperature
         }
 
+    async def _execute_supervisor_like_cli(self, config: Dict[str, Any]):
+        """Execute supervisor using the same pattern as CLI"""
+        project_id = config.get("project_id")
+        logger.debug("Received config in _execute_supervisor_like_cli: %s", config)
+        logger.debug("Extracted project_id: %s", project_id)
+
+        if not project_id:
+            raise ValueError("Project ID is required to initialize the system")
+
+        # Tech stack will be auto-detected (None triggers detection in Supervisor)
+        tech_stack = config.get("tech_stack")  # Will be None - auto-detect
+        mode = config.get("mode", "implement_all")
+        specific_issue = config.get("specific_issue")
+
+        # Map web GUI modes to supervisor modes
+        supervisor_mode = _SUPERVISOR_MODES.get(mode, "implement")
+
+        await self.ws_manager.send_agent_output(
+            "System",
+            f"Initializing supervisor for project {project_id}",
+            "info"
+        )
+
+        llm_config = self._apply_llm_config(config)
+
         # Create MCP log callback for WebSocket integration
         async def mcp_log_callback(message: str, level: str = "info"):
             """Send MCP logs to WebSocket"""
@@ -249,9 +272,9 @@ class SystemOrchestrator:
 
     async def _initialize_supervisor(self, config: Dict[str, Any]):
         """Initialize the supervisor with configuration"""
-        print(f"[DEBUG] Received config in _initialize_supervisor: {config}")
+        logger.debug("Received config in _initialize_supervisor: %s", config)
         project_id = config.get("project_id")
-        print(f"[DEBUG] Extracted project_id: {project_id}")
+        logger.debug("Extracted project_id: %s", project_id)
         if not project_id:
             raise ValueError("Project ID is required to initialize the system")
 
@@ -294,7 +317,8 @@ class SystemOrchestrator:
 
         # Get open issues
         issues = await self._get_open_issues()
-        self.stats["total_issues"] = len(issues)
+        self.stats.total_issues = len(issues)
+        self._refresh_rates()
 
         await self.ws_manager.send_pipeline_update("fetch_issues", "completed", {
             "count": len(issues)
@@ -306,11 +330,12 @@ class SystemOrchestrator:
                 break
 
             progress = (i / len(issues)) * 100
-            await self.ws_manager.send_system_status({
+            # Queued in order for the next broadcast frame; nothing to await
+            self.ws_manager.post_event("system_status", {
                 "running": True,
                 "progress": progress,
                 "current_issue": issue,
-                "stats": self.stats
+                "stats": self.stats.snapshot()
             })
 
             await self._process_issue(issue)
@@ -322,7 +347,8 @@ class SystemOrchestrator:
         if not issue:
             raise ValueError(f"Issue #{issue_number} not found")
 
-        self.stats["total_issues"] = 1
+        self.stats.total_issues = 1
+        self._refresh_rates()
         await self._process_issue(issue)
 
     async def _process_issue(self, issue: Dict[str, Any]):
@@ -358,18 +384,19 @@ class SystemOrchestrator:
             await self._run_stage("review", issue)
 
             # Issue completed
-            self.stats["successful_issues"] += 1
+            self.stats.successful_issues += 1
             await self.ws_manager.send_issue_update(issue_id, "completed")
 
         except Exception as e:
-            self.stats["failed_issues"] += 1
+            self.stats.failed_issues += 1
             await self.ws_manager.send_issue_update(issue_id, "failed", {
                 "error": str(e)
             })
             raise
 
         finally:
-            self.stats["processed_issues"] += 1
+            self.stats.processed_issues += 1
+            self._refresh_rates()
             self.current_issue = None
             self.current_branch = None
 
@@ -381,29 +408,11 @@ class SystemOrchestrator:
         await self.ws_manager.send_pipeline_update(stage, "running")
 
         try:
-            # Capture agent output
-            output_buffer = io.StringIO()
-
-            with redirect_stdout(output_buffer), redirect_stderr(output_buffer):
-                if stage == "planning":
-                    success = await self._run_planning(issue)
-                elif stage == "coding":
-                    success = await self._run_coding(issue)
-                elif stage == "testing":
-                    success = await self._run_testing(issue)
-                elif stage == "review":
-                    success = await self._run_review(issue)
-                else:
-                    raise ValueError(f"Unknown stage: {stage}")
-
-            # Send captured output
-            output = output_buffer.getvalue()
-            if output:
-                await self.ws_manager.send_agent_output(
-                    self.current_agent,
-                    output,
-                    "success" if success else "error"
-                )
+            # Agent output is streamed live by the capture_output block in each runner
+            runner = self._stage_runners.get(stage)
+            if runner is None:
+                raise ValueError(f"Unknown stage: {stage}")
+            success = await runner(issue)
 
             if not success:
                 raise Exception(f"{stage.title()} stage failed")
@@ -419,7 +428,7 @@ class SystemOrchestrator:
         finally:
             self.current_stage = None
             self.current_agent = None
-            self.stats["agent_calls"] += 1
+            self.stats.agent_calls += 1
 
     async def _run_planning(self, issue: Dict[str, Any]) -> bool:
         """Run planning agent"""
@@ -436,7 +445,7 @@ class SystemOrchestrator:
     async def _run_coding(self, issue: Dict[str, Any]) -> bool:
         """Run coding agent"""
         with self.agent_monitor.capture_output("Coding Agent"):
-            branch = f"feature/issue-{issue.get('iid', issue.get('id'))}"
+            branch = self.current_branch  # Set once per issue by _process_issue
             if hasattr(self.supervisor, 'executor'):
                 return await self.supervisor.executor.execute_coding_agent(
                     issue=issue,
@@ -448,7 +457,7 @@ class SystemOrchestrator:
     async def _run_testing(self, issue: Dict[str, Any]) -> bool:
         """Run testing agent"""
         with self.agent_monitor.capture_output("Testing Agent"):
-            branch = f"feature/issue-{issue.get('iid', issue.get('id'))}"
+            branch = self.current_branch  # Set once per issue by _process_issue
             if hasattr(self.supervisor, 'executor'):
                 return await self.supervisor.executor.execute_testing_agent(
                     issue=issue,
@@ -460,7 +469,7 @@ class SystemOrchestrator:
     async def _run_review(self, issue: Dict[str, Any]) -> bool:
         """Run review agent"""
         with self.agent_monitor.capture_output("Review Agent"):
-            branch = f"feature/issue-{issue.get('iid', issue.get('id'))}"
+            branch = self.current_branch  # Set once per issue by _process_issue
             if hasattr(self.supervisor, 'executor'):
                 return await self.supervisor.executor.execute_review_agent(
                     issue=issue,
@@ -502,22 +511,26 @@ class SystemOrchestrator:
             "current_branch": self.current_branch,
             "progress": self._calculate_progress(),
             "start_time": self.start_time.isoformat() if self.start_time else None,
-            "stats": self.stats
+            "stats": self.stats.snapshot()
         }
 
     def get_statistics(self) -> Dict[str, Any]:
         """Get system statistics"""
         return {
-            **self.stats,
+            **self.stats.snapshot(),
             "uptime": self._calculate_uptime(),
             "success_rate": self._calculate_success_rate()
         }
 
+    def _refresh_rates(self):
+        """Recompute progress and success rate after the issue counters change"""
+        stats = self.stats
+        self._progress = (stats.processed_issues / stats.total_issues) * 100 if stats.total_issues else 0.0
+        self._success_rate = (stats.successful_issues / stats.processed_issues) * 100 if stats.processed_issues else 0.0
+
     def _calculate_progress(self) -> float:
-        """Calculate overall progress"""
-        if self.stats["total_issues"] == 0:
-            return 0.0
-        return (self.stats["processed_issues"] / self.stats["total_issues"]) * 100
+        """Overall progress (cached)"""
+        return self._progress
 
     def _calculate_uptime(self) -> int:
         """Calculate system uptime in seconds"""
@@ -526,10 +539,8 @@ class SystemOrchestrator:
         return int((datetime.now() - self.start_time).total_seconds())
 
     def _calculate_success_rate(self) -> float:
-        """Calculate success rate"""
-        if self.stats["processed_issues"] == 0:
-            return 0.0
-        return (self.stats["successful_issues"] / self.stats["processed_issues"]) * 100
+        """Success rate (cached)"""
+        return self._success_rate
 
     async def cleanup(self):
         """Clean up resources"""
@@ -546,6 +557,5 @@ def get_orchestrator() -> SystemOrchestrator:
     """Get or create the global orchestrator instance"""
     global _orchestrator
     if _orchestrator is None:
-        from .websocket import ws_manager
         _orchestrator = SystemOrchestrator(ws_manager)
     return _orchestrator
\ No newline at end of file
@@ -0,0 +1,63 @@
+"""
+In-memory rate limiting for expensive API endpoints
+Token buckets cap how often an endpoint may hit the MCP server / GitLab API
+"""
+
+import functools
+import math
+import time
+
+from fastapi import HTTPException
+
+
+class TokenBucket:
+    """Allows `limit` calls per `period` seconds, refilling continuously"""
+
+    def __init__(self, limit: int, period: float):
+        self.capacity = limit
+        self.refill_rate = limit / period
+        self.tokens = float(limit)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_rate)
+        self.updated = now
+
+    def try_acquire(self) -> bool:
+        """Take one token if available"""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def retry_after(self) -> int:
+        """Seconds until the next token is available"""
+        return max(1, math.ceil((1 - self.tokens) / self.refill_rate))
+
+
+def rate_limited(limit: int, period: float):
+    """
+    Reject calls to an async endpoint beyond `limit` per `period` seconds with 429.
+
+    Place it below @cached so cache hits do not consume tokens. The bucket is
+    shared by all callers (single-process deployment) and exposed as `.bucket`.
+    """
+    def decorator(func):
+        bucket = TokenBucket(limit, period)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if not bucket.try_acquire():
+                raise HTTPException(
+                    status_code=429,
+                    detail="Too many requests",
+                    headers={"Retry-After": str(bucket.retry_after())}
+                )
+            return await func(*args, **kwargs)
+
+        wrapper.bucket = bucket
+        return wrapper
+
+    return decorator
@@ -3,25 +3,260 @@ WebSocket connection manager for real-time updates
 Enhanced with comprehensive debugging for connection lifecycle tracking
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set, Tuple, Union, Coroutine
 from fastapi import WebSocket
-import json
+import orjson
 import asyncio
+import threading
+import time
 from datetime import datetime
-import traceback
+import logging
+import zlib
+from itertools import groupby, islice
+from collections import deque
+from dataclasses import dataclass
 from fastapi.encoders import jsonable_encoder
 
 
+logger = logging.getLogger(__name__)
+
+# Broadcast frames at least this large are zlib-compressed once for all clients,
+# when enough clients share them to amortize the compression. Compressed frames
+# start with the zlib header byte 0x78, never "{", so the client can tell them apart.
+COMPRESS_MIN_BYTES = 1024
+COMPRESS_MIN_CLIENTS = 4
+
+# WebSocket close codes (RFC 6455) -> description for the disconnection log
+CLOSE_CODES = {
+    1000: "Normal Closure",
+    1001: "Going Away (browser navigating away)",
+    1002: "Protocol Error",
+    1003: "Unsupported Data",
+    1005: "No Status Received",
+    1006: "Abnormal Closure (no close frame)",
+    1007: "Invalid Frame Payload Data",
+    1008: "Policy Violation",
+    1009: "Message Too Big",
+    1010: "Mandatory Extension Missing",
+    1011: "Internal Server Error",
+    1012: "Service Restart",
+    1013: "Try Again Later",
+    1014: "Bad Gateway",
+    1015: "TLS Handshake Failure"
+}
+
+
+# Batch frame around already-encoded events, spliced instead of re-encoding them
+_BATCH_PREFIX = b'{"type":"batch","events":['
+_BATCH_SUFFIX = b"]}"
+
+# Keepalive frame template; only the epoch-seconds timestamp is spliced in each tick
+_KEEPALIVE_PREFIX = b'{"type":"keepalive","timestamp":'
+_KEEPALIVE_SUFFIX = b'}'
+
+# Shared "details" payload for events sent without details (never mutated)
+_NO_DETAILS: Dict[str, Any] = {}
+
+
+def _json_default(obj: Any) -> Any:
+    """orjson fallback for types it cannot serialize natively (models, sets, ...)"""
+    # Common cases first; jsonable_encoder's recursive dispatch is the last resort
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    try:
+        return jsonable_encoder(obj)
+    except Exception:
+        return str(obj)
+
+
+def encode_message(message: Any) -> bytes:
+    """Serialize an outgoing message; datetimes are emitted as ISO strings"""
+    return orjson.dumps(message, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class BroadcastQueue:
+    """
+    Coalesces outgoing events into batched WebSocket frames.
+
+    The first queued event opens a short window; everything queued before it
+    closes (up to max_batch events) is encoded once and the same bytes are
+    sent to every client. A lone event goes out unwrapped, larger groups as
+    {"type": "batch", "events": [...]}. Within a batch, consecutive agent_output
+    events from the same agent and level are folded into one agent_output_batch.
+    """
+
+    def __init__(self, manager: "ConnectionManager", window: float = 0.005, max_batch: int = 64):
+        self.manager = manager
+        self.window = window
+        self.max_batch = max_batch
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    def put(self, event: Dict[str, Any], encoded: bytes):
+        """Queue an event and its encoded bytes for the next broadcast frame"""
+        if self._task is None or self._task.done():
+            self._task = self.manager.spawn(self._run())
+        self._queue.put_nowait((event, encoded))
+
+    async def stop(self):
+        """Stop the consumer task"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        """Drain the queue in windows and broadcast one frame per window"""
+        while True:
+            batch = [await self._queue.get()]
+            await asyncio.sleep(self.window)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            if not self.manager.has_clients:
+                continue
+
+            try:
+                entries = self._coalesce_outputs(batch)
+            except orjson.JSONEncodeError as e:
+                logger.error("[WS-ERROR] Failed to encode broadcast batch: %s", e)
+                continue
+            if len(entries) == 1:
+                payload = entries[0]  # A lone entry goes out unwrapped
+            else:
+                payload = _BATCH_PREFIX + b",".join(entries) + _BATCH_SUFFIX
+            await self.manager.broadcast_bytes(payload)
+
+    @staticmethod
+    def _coalesce_outputs(batch: List[Tuple[Dict[str, Any], bytes]]) -> List[bytes]:
+        """
+        Encoded batch entries, with runs of agent_output events (same agent/level)
+        folded into agent_output_batch events. Only folded runs are encoded here;
+        every other event reuses its bytes from _emit.
+        """
+        entries = []
+        for _, run in groupby(batch, key=lambda entry: _output_run_key(entry[0])):
+            run = list(run)
+            if len(run) == 1:
+                entries.append(run[0][1])
+                continue
+            first = run[0][0]["data"]
+            entries.append(encode_message({
+                "type": "agent_output_batch",
+                "data": {
+                    "agent": first.get("agent"),
+                    "level": first.get("level"),
+                    "contents": [event["data"].get("content") for event, _ in run]
+                },
+                "timestamp": run[-1][0].get("timestamp")
+            }))
+        return entries
+
+
+class ClientQueue:
+    """
+    Bounded outbound queue and writer task for one client.
+
+    Broadcasts only enqueue; the writer sends in order, so a slow client
+    backs up its own queue instead of holding up everyone else. When the
+    queue is full the oldest pending frame is dropped; a client that stays
+    full for another whole queue's worth of frames is disconnected.
+    """
+
+    def __init__(self, manager: "ConnectionManager", websocket: WebSocket, maxsize: int = 256):
+        self.manager = manager
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.task: Optional[asyncio.Task] = None
+        self.dropped = 0
+        self._overflow = 0  # Frames dropped since the writer last made progress
+
+    def put(self, payload: bytes):
+        """Queue a frame, dropping the oldest one if the queue is full"""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            self._overflow += 1
+            if self._overflow >= self.queue.maxsize:
+                self._evict()
+                return
+        self.queue.put_nowait(payload)
+
+    def _evict(self):
+        """Disconnect a client that is not keeping up and close its socket"""
+        self.manager.disconnect(self.websocket, reason=f"Client too slow ({self.dropped} frames dropped)")
+        self.manager.spawn(self._close(1013))  # Try Again Later
+
+    async def _close(self, code: int):
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass  # Already gone
+
+    def start(self):
+        """Start the writer task"""
+        self.task = self.manager.spawn(self._run())
+
+    def stop(self):
+        """Cancel the writer task"""
+        if self.task:
+            self.task.cancel()
+
+    async def _run(self):
+        """Send queued frames until the connection fails"""
+        while True:
+            payload = await self.queue.get()
+            try:
+                await self.websocket.send_bytes(payload)
+            except Exception as e:
+                connection_id = self.manager._connection_id(self.websocket)
+                if self.manager.debug_mode:
+                    logger.debug("[WS-DEBUG] Broadcast error to connection #%s: %s", connection_id, e)
+                else:
+                    logger.error("[WS-ERROR] Error broadcasting to client: %s", e)
+                self.manager.disconnect(self.websocket, reason=f"Broadcast error: {e}")
+                return
+            self._overflow = 0
+            self.manager._update_activity(self.websocket, sent=True)
+
+
+@dataclass(slots=True)
+class ConnInfo:
+    """Per-connection bookkeeping (times are epoch seconds)"""
+    connection_id: int
+    connected_at: float
+    last_ping: float
+    last_activity: float
+    client_host: str = "unknown"
+    messages_sent: int = 0
+    messages_received: int = 0
+
+
+def _output_run_key(event: Dict[str, Any]):
+    """Group key for consecutive agent_output events (unique for anything else)"""
+    if event.get("type") == "agent_output":
+        data = event["data"]
+        return ("agent_output", data.get("agent"), data.get("level"))
+    return id(event)
+
+
 class ConnectionManager:
     """Manages WebSocket connections for real-time communication"""
 
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
-        self.connection_info: Dict[WebSocket, Dict[str, Any]] = {}
+        # Active connections and their info; insertion-ordered, O(1) removal
+        self.connections: Dict[WebSocket, ConnInfo] = {}
 
         # Session persistence: Store message history for reconnection
-        self.message_history: List[Dict[str, Any]] = []
         self.max_history_size = 1000  # Keep last 1000 messages
+        # Encoded once when stored, so replays only join and send bytes
+        self.message_history: deque = deque(maxlen=self.max_history_size)  # Oldest evicted in O(1)
+        self.replay_batch_size = 64  # History messages per replayed batch frame
 
         # Session state for reconnection
         self.session_state = {
@@ -36,11 +271,17 @@ class ConnectionManager:
             "completed_issues": [],  # Track completed issues across reconnections
             "failed_issues": []  # Track failed issues across reconnections
         }
+        # Set mirrors of the two lists above for O(1) duplicate checks
+        self._issue_ids = {"completed": set(), "failed": set()}
 
         # Debugging: Connection lifecycle tracking
         self.connection_counter = 0  # Total connections since server start
-        self.disconnection_log: List[Dict[str, Any]] = []
         self.max_disconnect_log = 50  # Keep last 50 disconnections
+        # Running message totals across all connections (diagnostics read these directly)
+        self.total_messages_sent = 0
+        self.total_messages_received = 0
+        self.max_diagnostic_details = 100  # Connections listed individually in diagnostics
+        self.disconnection_log: deque = deque(maxlen=self.max_disconnect_log)
 
         # Debugging: Enable verbose logging
         self.debug_mode = True  # Set to False to reduce console output
@@ -50,59 +291,59 @@ class ConnectionManager:
         self.keepalive_task = None
         self._keepalive_running = False
 
+        # Outgoing events are coalesced into batched frames
+        self.broadcaster = BroadcastQueue(self)
+        self.client_queues: Dict[WebSocket, ClientQueue] = {}  # Per-client outbound queues
+        self._loop: Optional[asyncio.AbstractEventLoop] = None  # Loop serving the connections
+        self._loop_thread: Optional[int] = None  # Thread that runs it
+        self._tasks: Set[asyncio.Task] = set()  # Background tasks still running (see spawn)
+
     async def connect(self, websocket: WebSocket):
         """Accept and store a new WebSocket connection"""
-        connection_time = datetime.now()
+        connection_time = time.time()
         self.connection_counter += 1
         connection_id = self.connection_counter
+        self._bind_loop()
 
         try:
             await websocket.accept()
-            self.active_connections.append(websocket)
-            self.connection_info[websocket] = {
-                "connection_id": connection_id,
-                "connected_at": connection_time,
-                "last_ping": connection_time,
-                "last_activity": connection_time,
-                "messages_sent": 0,
-                "messages_received": 0,
-                "client_state": websocket.client.host if websocket.client else "unknown"
-            }
-
+            # Every frame for this socket, replay included, goes through its queue
+            client = ClientQueue(self, websocket)
+            self.client_queues[websocket] = client
+            self.connections[websocket] = ConnInfo(
+                connection_id=connection_id,
+                connected_at=connection_time,
+                last_ping=connection_time,
+                last_activity=connection_time,  # Refreshed on every frame
+                client_host=websocket.client.host if websocket.client else "unknown"
+            )
+
+            logger.info("[WS] Client #%d connected. Total connections: %d", connection_id, len(self.connections))
             if self.debug_mode:
-                print(f"[WS-DEBUG] ========== NEW CONNECTION ==========")
-                print(f"[WS-DEBUG] Connection ID: #{connection_id}")
-                print(f"[WS-DEBUG] Client: {websocket.client.host if websocket.client else 'unknown'}:{websocket.client.port if websocket.client else 'unknown'}")
-                print(f"[WS-DEBUG] Time: {connection_time.isoformat()}")
-                print(f"[WS-DEBUG] Total Active: {len(self.active_connections)}")
-                print(f"[WS-DEBUG] Total Since Start: {self.connection_counter}")
-                print(f"[WS-DEBUG] ======================================")
-            else:
-                print(f"[WS] Client connected. Total connections: {len(self.active_connections)}")
+                logger.debug(
+                    "[WS-DEBUG] Connection #%d: client=%s time=%s total_since_start=%d",
+                    connection_id, websocket.client, connection_time, self.connection_counter
+                )
 
-            # Replay message history for reconnection
+            # Queue the message history for reconnection ahead of live broadcasts
             await self._replay_history(websocket)
+            client.start()
 
         except Exception as e:
-            print(f"[WS-ERROR] Failed to accept connection: {e}")
-            traceback.print_exc()
+            logger.exception("[WS-ERROR] Failed to accept connection: %s", e)
             raise
 
     def disconnect(self, websocket: WebSocket, reason: Optional[str] = None, close_code: Optional[int] = None):
         """Remove a WebSocket connection with detailed logging"""
-        disconnect_time = datetime.now()
+        conn_info = self.connections.get(websocket)
+        if conn_info is None:
+            return  # Already removed (writer error, eviction or shutdown)
 
-        # Get connection info before removal
-        conn_info = self.connection_info.get(websocket, {})
-        connection_id = conn_info.get("connection_id", "unknown")
-        connected_at = conn_info.get("connected_at")
-        messages_sent = conn_info.get("messages_sent", 0)
-        messages_received = conn_info.get("messages_received", 0)
-
-        # Calculate connection duration
-        duration = None
-        if connected_at:
-            duration = (disconnect_time - connected_at).total_seconds()
+        disconnect_time = time.time()
+        connection_id = conn_info.connection_id
+        messages_sent = conn_info.messages_sent
+        messages_received = conn_info.messages_received
+        duration = disconnect_time - conn_info.connected_at
 
         # Interpret close code
         close_reason = self._interpret_close_code(close_code) if close_code else "Normal disconnect"
@@ -110,7 +351,7 @@ class ConnectionManager:
         # Log disconnection
         disconnect_entry = {
             "connection_id": connection_id,
-            "disconnected_at": disconnect_time.isoformat(),
+            "disconnected_at": datetime.fromtimestamp(disconnect_time).isoformat(),
             "duration_seconds": duration,
             "messages_sent": messages_sent,
             "messages_received": messages_received,
@@ -118,127 +359,117 @@ class ConnectionManager:
             "close_reason": close_reason,
             "reason": reason or "No reason provided"
         }
-        self.disconnection_log.append(disconnect_entry)
-
-        # Limit disconnection log size
-        if len(self.disconnection_log) > self.max_disconnect_log:
-            self.disconnection_log = self.disconnection_log[-self.max_disconnect_log:]
+        self.disconnection_log.append(disconnect_entry)  # Bounded by maxlen
 
         # Remove connection
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-        if websocket in self.connection_info:
-            del self.connection_info[websocket]
+        client = self.client_queues.pop(websocket, None)
+        if client:
+            client.stop()
+        self.connections.pop(websocket, None)
 
-        # Debug logging
+        logger.info("[WS] Client #%s disconnected. Total connections: %d", connection_id, len(self.connections))
         if self.debug_mode:
-            print(f"[WS-DEBUG] ========== DISCONNECTION ==========")
-            print(f"[WS-DEBUG] Connection ID: #{connection_id}")
-            print(f"[WS-DEBUG] Duration: {duration:.2f}s" if duration else "[WS-DEBUG] Duration: unknown")
-            print(f"[WS-DEBUG] Messages Sent: {messages_sent}")
-            print(f"[WS-DEBUG] Messages Received: {messages_received}")
-            print(f"[WS-DEBUG] Close Code: {close_code} ({close_reason})")
-            print(f"[WS-DEBUG] Reason: {reason or 'None'}")
-            print(f"[WS-DEBUG] Active Connections: {len(self.active_connections)}")
-            print(f"[WS-DEBUG] ======================================")
-        else:
-            print(f"[WS] Client disconnected. Total connections: {len(self.active_connections)}")
-
-    def _interpret_close_code(self, code: int) -> str:
+            logger.debug(
+                "[WS-DEBUG] Connection #%s: duration=%ss sent=%d received=%d close=%s (%s) reason=%s",
+                connection_id, duration, messages_sent, messages_received, close_code, close_reason, reason
+            )
+
+    @staticmethod
+    def _interpret_close_code(code: int) -> str:
         """Interpret WebSocket close codes"""
-        close_codes = {
-            1000: "Normal Closure",
-            1001: "Going Away (browser navigating away)",
-            1002: "Protocol Error",
-            1003: "Unsupported Data",
-            1005: "No Status Received",
-            1006: "Abnormal Closure (no close frame)",
-            1007: "Invalid Frame Payload Data",
-            1008: "Policy Violation",
-            1009: "Message Too Big",
-            1010: "Mandatory Extension Missing",
-            1011: "Internal Server Error",
-            1012: "Service Restart",
-            1013: "Try Again Later",
-            1014: "Bad Gateway",
-            1015: "TLS Handshake Failure"
-        }
-        return close_codes.get(code, f"Unknown Code ({code})")
+        return CLOSE_CODES.get(code, f"Unknown Code ({code})")
 
     async def disconnect_all(self):
-        """Disconnect all active connections"""
-        for connection in self.active_connections[:]:
-            try:
-                await connection.close()
-            except:
-                pass
-            self.disconnect(connection)
+        """Disconnect all active connections, closing their sockets concurrently"""
+        connections, self.connections = self.connections, {}
+        clients, self.client_queues = self.client_queues, {}
+        if not connections:
+            return
+
+        for client in clients.values():
+            client.stop()
+
+        # One log entry for the whole shutdown instead of one per connection
+        self.disconnection_log.append({
+            "connection_id": None,
+            "disconnected_at": datetime.now().isoformat(),
+            "duration_seconds": None,
+            "messages_sent": sum(info.messages_sent for info in connections.values()),
+            "messages_received": sum(info.messages_received for info in connections.values()),
+            "close_code": 1001,
+            "close_reason": CLOSE_CODES[1001],
+            "reason": f"Server shutdown ({len(connections)} connections)"
+        })
+        logger.info("[WS] Disconnecting %d clients for shutdown", len(connections))
+
+        await asyncio.gather(*(c.close(code=1001) for c in connections), return_exceptions=True)
+
+    def _connection_id(self, websocket: WebSocket):
+        """Connection number for log messages ("unknown" once it is gone)"""
+        info = self.connections.get(websocket)
+        return info.connection_id if info is not None else "unknown"
 
     def _update_activity(self, websocket: WebSocket, sent: bool = False, received: bool = False):
-        """Update connection activity tracking"""
-        if websocket in self.connection_info:
-            self.connection_info[websocket]["last_activity"] = datetime.now()
+        """Update connection activity tracking (a clock read, no datetime per frame)"""
+        info = self.connections.get(websocket)
+        if info is not None:
+            info.last_activity = time.time()
             if sent:
-                self.connection_info[websocket]["messages_sent"] += 1
+                info.messages_sent += 1
+                self.total_messages_sent += 1
             if received:
-                self.connection_info[websocket]["messages_received"] += 1
-
-    async def send_personal_message(self, message: str, websocket: WebSocket):
-        """Send a message to a specific WebSocket connection"""
-        try:
-            await websocket.send_text(message)
-            self._update_activity(websocket, sent=True)
-        except Exception as e:
-            conn_info = self.connection_info.get(websocket, {})
-            connection_id = conn_info.get("connection_id", "unknown")
-            if self.debug_mode:
-                print(f"[WS-DEBUG] Error sending to connection #{connection_id}: {e}")
-                traceback.print_exc()
-            else:
-                print(f"[WS-ERROR] Error sending message to client: {e}")
-            self.disconnect(websocket, reason=f"Send error: {str(e)}")
+                info.messages_received += 1
+                self.total_messages_received += 1
 
-    async def broadcast(self, message: str):
-        """Broadcast a message to all connected clients"""
-        disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-                self._update_activity(connection, sent=True)
-            except Exception as e:
-                conn_info = self.connection_info.get(connection, {})
-                connection_id = conn_info.get("connection_id", "unknown")
-                if self.debug_mode:
-                    print(f"[WS-DEBUG] Broadcast error to connection #{connection_id}: {e}")
-                else:
-                    print(f"[WS-ERROR] Error broadcasting to client: {e}")
-                disconnected.append((connection, str(e)))
+    async def send_personal_message(self, message: Union[str, bytes], websocket: WebSocket):
+        """
+        Queue a message for one connection (always as a binary frame).
 
-        # Remove disconnected clients
-        for conn, error in disconnected:
-            self.disconnect(conn, reason=f"Broadcast error: {error}")
+        It goes behind the client's pending broadcasts, so the client's writer
+        task stays the only coroutine sending on the socket.
+        """
+        client = self.client_queues.get(websocket)
+        if client is None:
+            return  # Not connected (or already evicted)
+        if isinstance(message, str):
+            message = message.encode("utf-8")
+        client.put(message)
 
-    async def broadcast_json(self, data: Dict[str, Any]):
-        """Broadcast JSON data to all connected clients"""
-        message = json.dumps(data)
-        await self.broadcast(message)
+    async def broadcast(self, message: str):
+        """Broadcast a message to all connected clients (encoded once, shared by all)"""
+        await self.broadcast_bytes(message.encode("utf-8"))
+
+    async def broadcast_bytes(self, payload: bytes):
+        """Queue one pre-encoded payload for every connected client"""
+        if len(payload) >= COMPRESS_MIN_BYTES and len(self.client_queues) >= COMPRESS_MIN_CLIENTS:
+            payload = zlib.compress(payload, 1)
+        for client in list(self.client_queues.values()):  # put() may evict a client
+            client.put(payload)
+
+    @property
+    def debug_mode(self) -> bool:
+        """Whether verbose connection diagnostics are logged"""
+        return self._debug_mode
+
+    @debug_mode.setter
+    def debug_mode(self, enabled: bool):
+        self._debug_mode = enabled
+        # The diagnostics are debug records; NOTSET falls back to AGENTICSYS_LOG_LEVEL
+        logger.setLevel(logging.DEBUG if enabled else logging.NOTSET)
+
+    @property
+    def has_clients(self) -> bool:
+        """Whether any WebSocket client is connected"""
+        return bool(self.connections)
 
     def active_connections_count(self) -> int:
         """Get the count of active connections"""
-        return len(self.active_connections)
-
-    def _store_message(self, event_type: str, data: Any):
-        """Store message in history for replay on reconnection"""
-        message = {
-            "type": event_type,
-            "data": data,
-            "timestamp": datetime.now().isoformat()
-        }
-        self.message_history.append(message)
+        return len(self.connections)
 
-        # Limit history size
-        if len(self.message_history) > self.max_history_size:
-            self.message_history = self.message_history[-self.max_history_size:]
+    def _store_message(self, event_type: str, data: Any, encoded: Optional[bytes]):
+        """Store the encoded message in history for replay on reconnection"""
+        if encoded is not None:
+            self.message_history.append(encoded)  # Bounded by maxlen
 
         # Update session state based on message type
         if event_type == "system_status":
@@ -256,68 +487,100 @@ class ConnectionManager:
     async def _replay_history(self, websocket: WebSocket):
         """Replay stored message history to newly connected client"""
         if not self.message_history:
-            print("[WS] No history to replay")
+            logger.debug("[WS] No history to replay")
             # Send current session state even if no history
             await self._send_session_state(websocket)
             return
 
-        print(f"[WS] Replaying {len(self.message_history)} messages to new client")
+        logger.info("[WS] Replaying %d messages to new client", len(self.message_history))
 
         # Send session restoration notification
-        await self.send_personal_message(json.dumps({
+        await self.send_personal_message(encode_message({
             "type": "session_restore",
             "data": {
                 "message": f"Restoring session with {len(self.message_history)} messages",
                 "history_count": len(self.message_history)
             },
-            "timestamp": datetime.now().isoformat()
+            "timestamp": time.time()
         }), websocket)
 
-        # Replay all stored messages
-        for message in self.message_history:
-            try:
-                await websocket.send_text(json.dumps(self._encode_for_transport(message), ensure_ascii=False))
-                # Small delay to prevent overwhelming the client
-                await asyncio.sleep(0.001)
-            except Exception as e:
-                print(f"[WS] Error replaying message: {e}")
-                break
+        # Replay stored messages as batch frames spliced from the encoded entries
+        history = list(self.message_history)
+        for start in range(0, len(history), self.replay_batch_size):
+            chunk = history[start:start + self.replay_batch_size]
+            await self.send_personal_message(_BATCH_PREFIX + b",".join(chunk) + _BATCH_SUFFIX, websocket)
 
-        print("[WS] History replay complete")
-
-    def _encode_for_transport(self, data: Any) -> Any:
-        """Encode data for WebSocket transport using FastAPI's jsonable_encoder"""
-        try:
-            return jsonable_encoder(data)
-        except Exception as e:
-            print(f"[WS-ERROR] Failed to encode data for transport: {e}")
-            # Return simple string representation as fallback
-            return {"error": "encoding_failed", "data": str(data)}
+        logger.debug("[WS] History replay complete")
 
     async def _send_session_state(self, websocket: WebSocket):
         """Send current session state to client"""
         message = {
             "type": "system_status",
             "data": self.session_state,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": time.time()
         }
-        await self.send_personal_message(json.dumps(message), websocket)
-        print(f"[WS] Sent current system status to new connection: running={self.session_state['running']}")
+        await self.send_personal_message(encode_message(message), websocket)
+        logger.debug("[WS] Sent current system status to new connection: running=%s", self.session_state["running"])
+
+    def post_event(self, event_type: str, data: Any) -> bool:
+        """
+        Queue an event from synchronous code (stdout capture, monitors).
+
+        On the connections' event loop the event is queued directly; from any
+        other thread it is handed over with call_soon_threadsafe. Either way no
+        coroutine or future is created per event.
+
+        Returns:
+            False if there is no event loop to deliver the event on
+        """
+        if self._loop is None and not self._bind_loop():
+            return False
+
+        if threading.get_ident() == self._loop_thread:
+            self._emit(event_type, data)
+            return True
+
+        if self._loop.is_closed():
+            return False
+        self._loop.call_soon_threadsafe(self._emit, event_type, data)
+        return True
+
+    def _bind_loop(self) -> bool:
+        """Remember the running event loop and its thread (once per loop)"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        if loop is not self._loop:
+            self._loop = loop
+            self._loop_thread = threading.get_ident()
+        return True
 
     async def send_event(self, event_type: str, data: Any):
         """Send an event to all connected clients"""
-        encoded_data = self._encode_for_transport(data)
-        message = self._encode_for_transport({
+        self._emit(event_type, data)
+
+    def _emit(self, event_type: str, data: Any):
+        """Store an event for replay and queue it for broadcast (encoded once, by orjson)"""
+        message = {
             "type": event_type,
-            "data": encoded_data,
-            "timestamp": datetime.now().isoformat()
-        })
+            "data": data,
+            "timestamp": time.time()  # Epoch seconds; the client formats it if needed
+        }
+        # The same bytes go to the history and the broadcaster
+        try:
+            encoded = encode_message(message)
+        except orjson.JSONEncodeError as e:
+            logger.error("[WS-ERROR] Failed to encode %s: %s", event_type, e)
+            encoded = None
 
         # Store message for history replay
-        self._store_message(event_type, encoded_data)
+        self._store_message(event_type, data, encoded)
 
-        # Broadcast to all connected clients
-        await self.broadcast_json(message)
+        # Queue for the next batched broadcast, unless nobody is listening
+        # (the event is still in the history for clients that connect later)
+        if encoded is not None and self.connections:
+            self.broadcaster.put(message, encoded)
 
     async def send_agent_output(self, agent: str, content: str, level: str = "info"):
         """Send agent output to all clients"""
@@ -342,7 +605,7 @@ class ConnectionManager:
         await self.send_event("pipeline_update", {
             "stage": stage,
             "status": status,
-            "details": details or {}
+            "details": details if details is not None else _NO_DETAILS
         })
 
     async def send_system_status(self, status: Dict[str, Any]):
@@ -351,34 +614,32 @@ class ConnectionManager:
 
     async def send_issue_update(self, issue_id: int, status: str, details: Dict[str, Any] = None):
         """Send issue processing update to all clients"""
-        # Update session state based on issue status
-        if status == "completed":
-            if issue_id not in self.session_state["completed_issues"]:
-                self.session_state["completed_issues"].append(issue_id)
-                print(f"[WS-STATE] Tracking completed issue #{issue_id}")
-        elif status == "failed":
-            if issue_id not in self.session_state["failed_issues"]:
-                self.session_state["failed_issues"].append(issue_id)
-                print(f"[WS-STATE] Tracking failed issue #{issue_id}")
+        # Update session state based on issue status (the lists stay JSON-ready)
+        seen = self._issue_ids.get(status)
+        if seen is not None and issue_id not in seen:
+            seen.add(issue_id)
+            self.session_state[f"{status}_issues"].append(issue_id)
+            if self.debug_mode:
+                logger.debug("[WS-STATE] Tracking %s issue #%s", status, issue_id)
 
         await self.send_event("issue_update", {
             "issue_id": issue_id,
             "status": status,
-            "details": details or {}
+            "details": details if details is not None else _NO_DETAILS
         })
 
     async def send_error(self, error: str, details: Dict[str, Any] = None):
         """Send error message to all clients"""
         await self.send_event("error", {
             "message": error,
-            "details": details or {}
+            "details": details if details is not None else _NO_DETAILS
         })
 
     async def send_success(self, message: str, details: Dict[str, Any] = None):
         """Send success message to all clients"""
         await self.send_event("success", {
             "message": message,
-            "details": details or {}
+            "details": details if details is not None else _NO_DETAILS
         })
 
     async def send_tech_stack(self, tech_stack: Dict[str, Any]):
@@ -398,7 +659,7 @@ class ConnectionManager:
 
     def clear_session(self):
         """Clear session history when system fully stops"""
-        print("[WS] Clearing session history")
+        logger.info("[WS] Clearing session history")
         self.message_history.clear()
         self.session_state = {
             "running": False,
@@ -412,12 +673,13 @@ class ConnectionManager:
             "completed_issues": [],
             "failed_issues": []
         }
+        self._issue_ids = {"completed": set(), "failed": set()}
 
     def get_session_info(self) -> Dict[str, Any]:
         """Get current session information"""
         return {
             "history_count": len(self.message_history),
-            "active_connections": len(self.active_connections),
+            "active_connections": len(self.connections),
             "total_connections": self.connection_counter,
             "session_state": self.session_state,
             "debug_mode": self.debug_mode
@@ -425,30 +687,29 @@ class ConnectionManager:
 
     def get_connection_diagnostics(self) -> Dict[str, Any]:
         """Get detailed connection diagnostics for debugging"""
-        # Get active connection details
+        # Get active connection details (capped; the totals below cover everyone)
         active_details = []
-        for ws in self.active_connections:
-            info = self.connection_info.get(ws, {})
-            connected_at = info.get("connected_at")
-            duration = (datetime.now() - connected_at).total_seconds() if connected_at else 0
-
+        now = time.time()
+        for info in islice(self.connections.values(), self.max_diagnostic_details):
             active_details.append({
-                "connection_id": info.get("connection_id", "unknown"),
-                "client": info.get("client_state", "unknown"),
-                "connected_for_seconds": round(duration, 2),
-                "messages_sent": info.get("messages_sent", 0),
-                "messages_received": info.get("messages_received", 0),
-                "last_activity": info.get("last_activity").isoformat() if info.get("last_activity") else None
+                "connection_id": info.connection_id,
+                "client": info.client_host,
+                "connected_for_seconds": round(now - info.connected_at, 2),
+                "messages_sent": info.messages_sent,
+                "messages_received": info.messages_received,
+                "last_activity": datetime.fromtimestamp(info.last_activity).isoformat()
             })
 
         # Get recent disconnections
-        recent_disconnects = self.disconnection_log[-10:]  # Last 10 disconnections
+        recent_disconnects = list(self.disconnection_log)[-10:]  # Last 10 disconnections
 
         return {
             "debug_mode": self.debug_mode,
             "total_connections_since_start": self.connection_counter,
-            "active_connections_count": len(self.active_connections),
+            "active_connections_count": len(self.connections),
             "active_connections": active_details,
+            "total_messages_sent": self.total_messages_sent,
+            "total_messages_received": self.total_messages_received,
             "recent_disconnections": recent_disconnects,
             "message_history_size": len(self.message_history),
             "session_state": self.session_state
@@ -490,13 +751,36 @@ class ConnectionManager:
         The keepalive uses exponential intervals and error isolation.
         """
         if self._keepalive_running:
-            print("[WS-KEEPALIVE] Keepalive already running")
+            logger.debug("[WS-KEEPALIVE] Keepalive already running")
             return
 
         self._keepalive_running = True
+        self._bind_loop()
         self.keepalive_task = asyncio.create_task(self._keepalive_loop())
-        print(f"[WS-KEEPALIVE] Started with {self.keepalive_interval}s interval")
-        print(f"[WS-KEEPALIVE] Using error-isolated ping mechanism to prevent TaskGroup interference")
+        logger.info("[WS-KEEPALIVE] Started with %ss interval", self.keepalive_interval)
+
+    def spawn(self, coro: Coroutine) -> asyncio.Task:
+        """
+        Start a background task owned by the manager.
+
+        The set holds a strong reference until the task finishes (the loop only
+        keeps weak ones) and lets shutdown cancel whatever is still running.
+        """
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def cancel_tasks(self):
+        """Cancel all background tasks (broadcaster, writers, closes) and wait for them"""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def stop_broadcaster(self):
+        """Stop the batched broadcast task"""
+        await self.broadcaster.stop()
 
     async def stop_keepalive(self):
         """Stop the keepalive background task"""
@@ -507,68 +791,44 @@ class ConnectionManager:
                 await self.keepalive_task
             except asyncio.CancelledError:
                 pass
-            print("[WS-KEEPALIVE] Stopped")
+            logger.info("[WS-KEEPALIVE] Stopped")
 
     async def _keepalive_loop(self):
         """
         Background task that sends periodic pings to keep connections alive.
 
-        Uses asyncio.shield() for each ping operation to prevent interference
-        with other tasks in the event loop (especially MCP client operations).
+        Pings go through the per-client queues, so the whole wave is queued in
+        one pass and each writer sends it concurrently with the others.
         """
-        print(f"[WS-KEEPALIVE] Loop started - sending pings every {self.keepalive_interval}s")
-        print(f"[WS-KEEPALIVE] Using shielded operations to prevent TaskGroup interference")
+        logger.debug("[WS-KEEPALIVE] Loop started - sending pings every %ss", self.keepalive_interval)
 
         try:
             while self._keepalive_running:
                 await asyncio.sleep(self.keepalive_interval)
 
-                if not self.active_connections:
+                if not self.connections:
                     continue
 
-                # Send ping to all active connections with error isolation
-                disconnected = []
-                for connection in self.active_connections[:]:  # Copy list to avoid modification during iteration
-                    try:
-                        # Shield the ping operation from external cancellation
-                        # This prevents TaskGroup exceptions in other parts of the system
-                        # from interfering with WebSocket keepalive
-                        await asyncio.shield(
-                            connection.send_json({
-                                "type": "keepalive",
-                                "timestamp": datetime.now().isoformat()
-                            })
-                        )
-
-                        # Update last ping time
-                        if connection in self.connection_info:
-                            self.connection_info[connection]["last_ping"] = datetime.now()
-
-                    except asyncio.CancelledError:
-                        # Keepalive task itself is being cancelled (e.g., server shutdown)
-                        # Don't mark connection as failed, just stop
-                        print(f"[WS-KEEPALIVE] Keepalive cancelled during ping")
-                        raise
-
-                    except Exception as e:
-                        # Individual ping failed - mark connection as dead
-                        conn_info = self.connection_info.get(connection, {})
-                        connection_id = conn_info.get("connection_id", "unknown")
-                        print(f"[WS-KEEPALIVE] Ping failed for connection #{connection_id}: {e}")
-                        disconnected.append((connection, str(e)))
-
-                # Remove dead connections
-                for conn, error in disconnected:
-                    self.disconnect(conn, reason=f"Keepalive ping failed: {error}")
-
-                if self.debug_mode and self.active_connections:
-                    print(f"[WS-KEEPALIVE] Sent keepalive to {len(self.active_connections)} connections")
+                # One timestamp and one encoded payload per tick, shared by every connection
+                now = time.time()
+                payload = _KEEPALIVE_PREFIX + repr(now).encode() + _KEEPALIVE_SUFFIX
+
+                # Queue the ping behind each client's pending frames. Enqueueing cannot
+                # block or be interrupted mid-send, so no per-ping shield is needed;
+                # a failed send is handled (and the client disconnected) by its writer.
+                for connection, client in list(self.client_queues.items()):
+                    client.put(payload)
+                    info = self.connections.get(connection)
+                    if info is not None:
+                        info.last_ping = now
+
+                if self.debug_mode and self.connections:
+                    logger.debug("[WS-KEEPALIVE] Sent keepalive to %d connections", len(self.connections))
 
         except asyncio.CancelledError:
-            print("[WS-KEEPALIVE] Loop cancelled")
-        except Exception as e:
-            print(f"[WS-KEEPALIVE] Loop error: {e}")
-            traceback.print_exc()
+            logger.debug("[WS-KEEPALIVE] Loop cancelled")
+        except Exception:
+            logger.exception("[WS-KEEPALIVE] Loop error")
 
 
 # Global connection manager instance
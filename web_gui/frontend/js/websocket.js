@@ -11,6 +11,9 @@ class WebSocketClient {
         this.maxReconnectAttempts = 10;
         this.listeners = new Map();
         this.isConnected = false;
+        this.decoder = new TextDecoder();
+        // Frames are decoded in arrival order, even when inflating is async
+        this.inbox = Promise.resolve();
     }
 
     connect() {
@@ -18,6 +21,8 @@ class WebSocketClient {
 
         try {
             this.ws = new WebSocket(this.url);
+            // Server sends pre-encoded JSON as binary frames
+            this.ws.binaryType = 'arraybuffer';
 
             this.ws.onopen = () => {
                 console.log('WebSocket connected');
@@ -45,12 +50,10 @@ class WebSocketClient {
             };
 
             this.ws.onmessage = (event) => {
-                try {
-                    const message = JSON.parse(event.data);
-                    this.handleMessage(message);
-                } catch (error) {
-                    console.error('Failed to parse message:', error);
-                }
+                this.inbox = this.inbox
+                    .then(() => this.decodeFrame(event.data))
+                    .then(text => this.handleMessage(JSON.parse(text)))
+                    .catch(error => console.error('Failed to parse message:', error));
             };
         } catch (error) {
             console.error('Failed to create WebSocket:', error);
@@ -58,9 +61,38 @@ class WebSocketClient {
         }
     }
 
+    async decodeFrame(data) {
+        if (typeof data === 'string') {
+            return data;
+        }
+        // Large broadcasts arrive zlib-compressed (first byte 0x78, JSON starts with '{')
+        if (new Uint8Array(data, 0, 1)[0] === 0x78) {
+            const stream = new Blob([data]).stream().pipeThrough(new DecompressionStream('deflate'));
+            data = await new Response(stream).arrayBuffer();
+        }
+        return this.decoder.decode(data);
+    }
+
     handleMessage(message) {
         const { type, data, timestamp } = message;
 
+        // Server coalesces bursts of events into a single batch frame
+        if (type === 'batch') {
+            message.events.forEach(event => this.handleMessage(event));
+            return;
+        }
+
+        // Consecutive outputs from one agent arrive folded together
+        if (type === 'agent_output_batch') {
+            const { agent, level, contents } = data;
+            contents.forEach(content => this.handleMessage({
+                type: 'agent_output',
+                data: { agent, content, level },
+                timestamp
+            }));
+            return;
+        }
+
         // Emit to specific event listeners
         this.emit(type, data);
 